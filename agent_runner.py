@@ -1,41 +1,18 @@
-import os
-from dotenv import load_dotenv
-from langchain.agents import initialize_agent, AgentType
-from langchain_google_genai import ChatGoogleGenerativeAI
-from symptom_agent import symptom_tool
-
-# -------------------
-# Load API key from .env
-# -------------------
-load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY")
-
-# -------------------
-# Initialize Gemini LLM
-# -------------------
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash",
-    google_api_key=api_key,
-    temperature=0.2,
-)
-
-# -------------------
-# Set up tools and agent
-# -------------------
-tools = [symptom_tool()]
-
-agent = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=False,
-)
+from utils.agent_pool import get_agent_pool, DEFAULT_SESSION
+from utils.symptom_router import get_symptom_router
 
 # -------------------
 # Public runner function
 # -------------------
-def run_symptom_agent(user_input: str) -> str:
+# Symptom-only input is answered by the local router without any LLM call;
+# everything else goes to the pooled agent, which shares one LLM and keeps a
+# bounded history per session (see utils/agent_pool.py).
+def run_symptom_agent(user_input: str, session_id: str = DEFAULT_SESSION) -> str:
     try:
-        return agent.run(user_input)
+        answer = get_symptom_router().route(user_input)
+        if answer is not None:
+            get_agent_pool().record_turn(user_input, answer, session_id)
+            return answer
+        return get_agent_pool().run(user_input, session_id)
     except Exception as e:
         return f"❌ Agent Error: {e}"
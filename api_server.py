@@ -0,0 +1,268 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional, Union
+
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+from utils.context_packer import CONTEXT_TOKEN_BUDGET
+from utils.qa_engine import QAEngine, EngineBusy
+from utils.rag_retriever import retrieve_context, get_retriever_service
+from utils.response_cache import get_response_cache
+from utils.symptom_checker import (
+    get_checker, parse_symptoms, predict_diseases, predict_diseases_batch, format_symptom_response,
+)
+from utils.telemetry import registry, record_span, incr
+
+# ---------------------------
+# MedBot HTTP/JSON API
+# ---------------------------
+# Headless compute tier for the Streamlit UI (MEDBOT_API_URL) and batch clients.
+# The retriever, symptom checker and Q&A engine are loaded once per process.
+#
+#   uvicorn api_server:app --host 0.0.0.0 --port 8000 --workers 2
+#   python api_server.py --port 8000
+#
+# POST /diagnose   /diagnose/batch   /retrieve   /retrieve/batch   /ask   /ask/batch
+# GET  /health   /metrics (Prometheus text)
+
+load_dotenv()
+
+MAX_BATCH_SIZE = 10000
+MAX_ASK_BATCH_SIZE = 32
+
+Symptoms = Union[str, List[str]]
+
+
+# -------------------
+# Request models
+# -------------------
+class DiagnoseRequest(BaseModel):
+    symptoms: Symptoms
+    top_n: int = Field(3, ge=1, le=50)
+    min_score: float = Field(0.0, ge=0.0, le=1.0)
+    mode: Optional[Literal["heuristic", "model"]] = None  # server default: MEDBOT_SYMPTOM_MODE
+
+
+class DiagnoseBatchRequest(BaseModel):
+    cases: List[Symptoms] = Field(..., max_length=MAX_BATCH_SIZE)
+    top_n: int = Field(3, ge=1, le=50)
+    min_score: float = Field(0.0, ge=0.0, le=1.0)
+    mode: Optional[Literal["heuristic", "model"]] = None
+
+
+class RetrieveRequest(BaseModel):
+    query: str = Field(..., min_length=1)
+    top_k: int = Field(3, ge=1, le=20)
+    max_context_tokens: int = Field(CONTEXT_TOKEN_BUDGET, ge=1)
+    hybrid: bool = True
+
+
+class RetrieveBatchRequest(BaseModel):
+    queries: List[str] = Field(..., max_length=MAX_BATCH_SIZE)
+    top_k: int = Field(3, ge=1, le=20)
+    max_context_tokens: int = Field(CONTEXT_TOKEN_BUDGET, ge=1)
+    hybrid: bool = True
+
+
+class AskRequest(BaseModel):
+    question: str = Field(..., min_length=1)
+    stream: bool = False
+
+
+class AskBatchRequest(BaseModel):
+    questions: List[str] = Field(..., max_length=MAX_ASK_BATCH_SIZE)
+
+
+def _symptom_string(symptoms: Symptoms) -> str:
+    return symptoms if isinstance(symptoms, str) else ", ".join(symptoms)
+
+
+def _context_items(items) -> list:
+    return [{"source": source, "chunk": chunk} for source, chunk in items]
+
+
+def _answer_payload(result: dict) -> dict:
+    return {
+        "answer": result["answer"],
+        "context_items": _context_items(result["context_items"]),
+        "cached": result["cached"],
+        "precomputed": result.get("precomputed", False),
+        "coalesced": result["coalesced"],
+        "attempts": result["attempts"],
+        "latency_ms": round(result.get("latency", 0.0) * 1000, 1),
+        "trace": result.get("trace"),
+    }
+
+
+# -------------------
+# App & resident models
+# -------------------
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Requests may ask for mode="model", so load (or train) the classifier before serving
+    get_checker().model()
+    try:
+        get_retriever_service().warm()
+    except Exception as e:
+        print(f"[WARN] Knowledge base not loaded, /retrieve and /ask will fail: {e}")
+    app.state.engine = QAEngine()
+    yield
+
+
+app = FastAPI(title="MedBot API", lifespan=lifespan)
+
+
+@app.middleware("http")
+async def count_requests(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    # Route template, not the raw URL, keeps label cardinality bounded
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    record_span(f"http{path}", start, time.perf_counter() - start)
+    incr("http_requests_total", path=path, status=response.status_code)
+    return response
+
+
+@app.get("/health")
+def health():
+    return {
+        "status": "ok",
+        "engine": app.state.engine.counters,
+        "cache": get_response_cache().stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(registry.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+# -------------------
+# Symptom diagnosis
+# -------------------
+@app.post("/diagnose")
+def diagnose(req: DiagnoseRequest):
+    symptom_string = _symptom_string(req.symptoms)
+    results = predict_diseases(symptom_string, top_n=req.top_n, min_score=req.min_score, mode=req.mode)
+    user_tokens = parse_symptoms(symptom_string)
+    return {
+        "symptoms": sorted(user_tokens),
+        "predictions": [
+            {
+                "disease": row["Disease"],
+                "score": float(row["score"]),
+                "matched_symptoms": sorted(user_tokens & row["symptom_tokens"]),
+            }
+            for _, row in results.iterrows()
+        ],
+        "formatted": format_symptom_response(symptom_string, results, req.mode),
+    }
+
+
+@app.post("/diagnose/batch")
+def diagnose_batch(req: DiagnoseBatchRequest):
+    results = predict_diseases_batch(req.cases, top_n=req.top_n, min_score=req.min_score, mode=req.mode)
+    return {
+        "results": [
+            {"predictions": [{"disease": d, "score": s} for d, s in predictions]}
+            for predictions in results
+        ]
+    }
+
+
+# -------------------
+# Retrieval
+# -------------------
+@app.post("/retrieve")
+def retrieve(req: RetrieveRequest):
+    context, items = retrieve_context(req.query, req.top_k, req.max_context_tokens, hybrid=req.hybrid)
+    return {"context": context, "context_items": _context_items(items)}
+
+
+@app.post("/retrieve/batch")
+def retrieve_batch(req: RetrieveBatchRequest):
+    results = []
+    for query in req.queries:
+        context, items = retrieve_context(query, req.top_k, req.max_context_tokens, hybrid=req.hybrid)
+        results.append({"context": context, "context_items": _context_items(items)})
+    return {"results": results}
+
+
+# -------------------
+# Q&A
+# -------------------
+@app.post("/ask")
+async def ask(req: AskRequest):
+    engine = app.state.engine
+    if not req.stream:
+        try:
+            return _answer_payload(await engine.answer(req.question))
+        except EngineBusy as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=502, detail=f"LLM request failed: {e}")
+
+    # NDJSON: {"text": ...} per piece, then one {"done": true, ...} or {"error": ...} line
+    pieces = asyncio.Queue()
+    loop = asyncio.get_running_loop()
+    task = asyncio.ensure_future(
+        engine.answer(req.question, on_piece=lambda p: loop.call_soon_threadsafe(pieces.put_nowait, p))
+    )
+    task.add_done_callback(lambda _: pieces.put_nowait(None))
+
+    async def lines():
+        streamed = False
+        while True:
+            piece = await pieces.get()
+            if piece is None:
+                break
+            streamed = True
+            yield json.dumps({"text": piece}) + "\n"
+        try:
+            result = task.result()
+        except EngineBusy as e:
+            yield json.dumps({"error": str(e), "busy": True}) + "\n"
+            return
+        except Exception as e:
+            yield json.dumps({"error": f"LLM request failed: {e}"}) + "\n"
+            return
+        if not streamed and result["answer"]:
+            yield json.dumps({"text": result["answer"]}) + "\n"
+        yield json.dumps({"done": True, **_answer_payload(result)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/ask/batch")
+async def ask_batch(req: AskBatchRequest):
+    engine = app.state.engine
+    results = await asyncio.gather(*(engine.answer(q) for q in req.questions), return_exceptions=True)
+    return {
+        "results": [
+            {"error": str(r), "busy": isinstance(r, EngineBusy)} if isinstance(r, Exception) else _answer_payload(r)
+            for r in results
+        ]
+    }
+
+
+def main(argv=None):
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="MedBot HTTP/JSON API.")
+    parser.add_argument("--host", default=os.getenv("MEDBOT_API_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("MEDBOT_API_PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+    uvicorn.run("api_server:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,18 @@
-import os
-import pandas as pd
 import streamlit as st
 from dotenv import load_dotenv
-import google.generativeai as genai
-from utils.rag_retriever import retrieve_context
-from prompt_templates import build_rag_prompt
-from utils.symptom_checker import predict_diseases, format_symptom_response
+from utils.symptom_lexicon import get_symptom_lexicon
+from utils.llm_backends import TimedStream
+from utils.api_client import get_api_client, APIBusy
+from utils.telemetry import start_trace
+
+# Heavy modules (embeddings/FAISS, pandas, the LLM SDK) are imported by the
+# mode that needs them, so the first page renders without loading them.
 
 # Load environment
 load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-DEFAULT_MAX_NEW_TOKENS = 2048
+
+# With MEDBOT_API_URL set, the UI is a thin client of api_server.py
+api_client = get_api_client()
 
 # -------------------
 # UI Config
@@ -86,19 +88,31 @@ st.markdown("""
 @st.cache_data
 def load_all_symptoms():
     try:
-        df = pd.read_csv("data/disease_symptom.csv")
-        if "Disease" not in df.columns:
-            st.error("CSV missing 'Disease' column.")
-            return []
-        symptoms = df.columns.tolist()
-        symptoms.remove("Disease")
-        return sorted([s.strip().lower().replace(" ", "_").replace("-", "_") for s in symptoms])
+        # Canonical ids from the memory-mapped compiled table (messy and duplicate headers merged)
+        return sorted(get_symptom_lexicon().symptoms)
     except Exception as e:
         st.error(f"Error loading symptoms: {e}")
         return []
 
 ALL_SYMPTOMS = load_all_symptoms()
 
+# -------------------
+# Resident Retriever
+# -------------------
+@st.cache_resource(show_spinner="Loading medical knowledge base...")
+def load_retriever():
+    # Loaded once per process and shared by all sessions; picks up rebuilt indexes on its own.
+    from utils.rag_retriever import get_retriever_service
+
+    return get_retriever_service().warm()
+
+@st.cache_resource(show_spinner="Loading symptom checker...")
+def load_symptom_checker():
+    # Loads the checker (and the classifier when MEDBOT_SYMPTOM_MODE=model) before the first diagnosis
+    from utils.symptom_checker import get_checker
+
+    return get_checker()
+
 # -------------------
 # Session State
 # -------------------
@@ -106,6 +120,8 @@ if 'current_mode' not in st.session_state:
     st.session_state.current_mode = "🧠 Medical Q&A"
 if 'selected_symptoms' not in st.session_state:
     st.session_state.selected_symptoms = []
+if 'last_trace' not in st.session_state:
+    st.session_state.last_trace = None
 
 # -------------------
 # Header
@@ -136,6 +152,11 @@ mode = st.session_state.current_mode
 # -------------------
 st.markdown("---")
 if mode == "🩺 Symptom Diagnosis":
+    try:
+        if api_client is None:
+            load_symptom_checker()
+    except Exception as e:
+        st.error(f"Error loading symptom checker: {e}")
     st.markdown("### 📋 Select Your Symptoms")
     selected = st.multiselect(
         "Search symptoms:",
@@ -148,6 +169,11 @@ if mode == "🩺 Symptom Diagnosis":
     st.session_state.selected_symptoms = selected
     user_input = ", ".join(selected) if selected else ""
 else:
+    try:
+        if api_client is None:
+            load_retriever()
+    except Exception as e:
+        st.error(f"Error loading knowledge base: {e}")
     st.markdown("### 💬 Ask Your Medical Question")
     user_input = st.text_area(
         "Enter your question:",
@@ -159,21 +185,51 @@ else:
 # -------------------
 # Gemini Response Generator
 # -------------------
+@st.cache_resource
+def load_llm_backend():
+    # Gemini by default; set MEDBOT_LLM_BACKEND=fake (or http + mock_llm_server.py) to run offline
+    from utils.llm_backends import get_backend
+
+    return get_backend()
+
+@st.cache_resource
+def load_qa_engine():
+    # One engine per process: all sessions share its LLM concurrency limit and in-flight coalescing
+    from utils.qa_engine import QAEngine
+
+    return QAEngine(backend=load_llm_backend()).start()
+
+def stream_gemini_response(question: str):
+    """
+    Returns (stream, request). Iterating the stream yields answer text as it is
+    generated; afterwards ``request.result`` holds the prompt and context items.
+    """
+    request = api_client.stream(question) if api_client else load_qa_engine().stream(question)
+    return TimedStream(request), request
+
 def generate_gemini_response(question: str):
     try:
-        context_str, context_items = retrieve_context(question)
-        prompt = build_rag_prompt(question, context_str)
-        model = genai.GenerativeModel("gemini-1.5-flash")
-        response = model.generate_content(
-            prompt,
-            generation_config={"max_output_tokens": DEFAULT_MAX_NEW_TOKENS, "temperature": 0.2}
-        )
-        if not response.candidates or not response.candidates[0].content.parts:
-            return ("⚠ No response returned.", prompt, context_items)
-        return (response.candidates[0].content.parts[0].text.strip(), prompt, context_items)
+        if api_client:
+            result = api_client.ask(question)
+            result["context_items"] = [(i["source"], i["chunk"]) for i in result["context_items"]]
+            result["prompt"] = ""
+        else:
+            result = load_qa_engine().submit(question).result()
+        if not result["answer"]:
+            return ("⚠ No response returned.", result["prompt"], result["context_items"])
+        return (result["answer"], result["prompt"], result["context_items"])
     except Exception as e:
         return (f"❌ Error: {e}", "", [])
 
+def render_answer(placeholder, answer: str):
+    placeholder.markdown(f"""
+        <div class="result-card">
+            <h3>💡 AI Response</h3>
+            <hr>
+            {answer}
+        </div>
+    """, unsafe_allow_html=True)
+
 # -------------------
 # Run Button & Output
 # -------------------
@@ -183,14 +239,28 @@ if st.button("🔍 Analyze", type="primary"):
     else:
         with st.spinner("Analyzing..."):
             if mode == "🧠 Medical Q&A":
-                answer, _, chunks_used = generate_gemini_response(user_input)
-                st.markdown(f"""
-                    <div class="result-card">
-                        <h3>💡 AI Response</h3>
-                        <hr>
-                        {answer}
-                    </div>
-                """, unsafe_allow_html=True)
+                from utils.qa_engine import EngineBusy
+
+                placeholder = st.empty()
+                answer, stream, chunks_used = "", None, []
+                try:
+                    stream, request = stream_gemini_response(user_input)
+                    for piece in stream:
+                        answer += piece
+                        render_answer(placeholder, answer + " ▌")
+                    render_answer(placeholder, answer.strip() or "⚠ No response returned.")
+                    chunks_used = request.result["context_items"]
+                    st.session_state.last_trace = request.result.get("trace")
+                except (EngineBusy, APIBusy):
+                    render_answer(placeholder, "⚠ MedBot is handling many questions right now. Please try again shortly.")
+                except Exception as e:
+                    render_answer(placeholder, f"❌ Error: {e}")
+                if stream is not None and stream.ttft is not None:
+                    # total_time stays None when the stream failed part-way
+                    timing = f"⏱ First token in {stream.ttft:.2f}s"
+                    if stream.total_time is not None:
+                        timing += f" · full answer in {stream.total_time:.2f}s"
+                    st.caption(timing)
                 if chunks_used:
                     with st.expander("📚 Reference Context"):
                         for i, (source, chunk) in enumerate(chunks_used, 1):
@@ -203,8 +273,15 @@ if st.button("🔍 Analyze", type="primary"):
                 else:
                     if len(current_symptoms) == 1:
                         st.info("ℹ️ Diagnosing with a single symptom may produce broader or less accurate results.")
-                    result_df = predict_diseases(user_input, top_n=3, min_score=0.0)
-                    formatted = format_symptom_response(user_input, result_df)
+                    if api_client:
+                        formatted = api_client.diagnose(user_input, top_n=3, min_score=0.0)["formatted"]
+                    else:
+                        from utils.symptom_checker import predict_diseases, format_symptom_response
+
+                        with start_trace("diagnose.request") as trace:
+                            result_df = predict_diseases(user_input, top_n=3, min_score=0.0)
+                            formatted = format_symptom_response(user_input, result_df)
+                        st.session_state.last_trace = trace.to_dict()
                     chips_html = ' '.join([
                         f'<span class="symptom-chip">{s.replace("_", " ").title()}</span>'
                         for s in current_symptoms
@@ -220,6 +297,43 @@ if st.button("🔍 Analyze", type="primary"):
                     """, unsafe_allow_html=True)
 
 
+# -------------------
+# Sidebar: response cache stats
+# -------------------
+if mode == "🧠 Medical Q&A":
+    st.sidebar.markdown("### ⚡ Response Cache")
+    try:
+        if api_client:
+            stats = api_client.health()["cache"]
+        else:
+            from utils.response_cache import get_response_cache
+
+            stats = get_response_cache().stats()
+        st.sidebar.caption(
+            f"Hits: {stats['hits']} (semantic: {stats['semantic_hits']}) · "
+            f"Misses: {stats['misses']} · Entries: {stats['entries']}"
+        )
+    except Exception as e:
+        st.sidebar.caption(f"⚠ Stats unavailable: {e}")
+
+# -------------------
+# Sidebar: debug timings of the last request
+# -------------------
+if st.sidebar.checkbox("🔬 Debug timings", value=False):
+    trace = st.session_state.last_trace
+    if not trace:
+        st.sidebar.caption("Run a request to see its stage breakdown.")
+    else:
+        st.sidebar.markdown(f"**{trace['name']}** · {trace['duration_ms']:.0f} ms")
+        if trace["spans"]:
+            spans = [{k: s[k] for k in ("name", "offset_ms", "duration_ms")} for s in trace["spans"]]
+            st.sidebar.dataframe(spans, hide_index=True, use_container_width=True)
+        if trace["counters"]:
+            st.sidebar.json(trace["counters"], expanded=False)
+        memory = trace.get("memory", {})
+        if memory:
+            st.sidebar.caption(" · ".join(f"{k}: {v:.0f}" for k, v in memory.items()))
+
 # -------------------
 # Footer
 # -------------------
@@ -0,0 +1,114 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from itertools import islice
+
+from utils.symptom_checker import SymptomChecker, BATCH_CHUNK_SIZE, SYMPTOM_MODE, SYMPTOM_MODES
+
+# ---------------------------
+# Batch symptom diagnosis CLI
+# ---------------------------
+# Streams symptom sets from CSV or JSONL and writes the top-n diseases per case.
+#
+#   python batch_diagnose.py cases.jsonl -o predictions.jsonl --top-n 3
+#   cat cases.csv | python batch_diagnose.py - --input-format csv -o -
+#   python batch_diagnose.py cases.jsonl -o predictions.jsonl --mode model
+#
+# JSONL input: {"id": ..., "symptoms": ["fever", "cough"]} or "fever, cough"
+# CSV input:   id,symptoms  (symptoms separated by ',' or ';' inside the field)
+
+
+def detect_format(path, explicit):
+    if explicit:
+        return explicit
+    ext = os.path.splitext(path)[1].lower()
+    return "csv" if ext == ".csv" else "jsonl"
+
+
+def read_cases(stream, fmt, id_column, symptoms_column):
+    if fmt == "csv":
+        for i, row in enumerate(csv.DictReader(stream)):
+            symptoms = (row.get(symptoms_column) or "").replace(";", ",")
+            yield row.get(id_column) or i, symptoms
+    else:
+        for i, line in enumerate(stream):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            yield record.get(id_column, i), record.get(symptoms_column) or ""
+
+
+class CaseWriter:
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            self.writer = csv.writer(stream)
+            self.writer.writerow(["id", "symptoms", "diseases", "scores"])
+
+    def write(self, case_id, symptoms, predictions):
+        if not isinstance(symptoms, str):
+            symptoms = ", ".join(symptoms)
+        if self.fmt == "csv":
+            self.writer.writerow([
+                case_id,
+                symptoms,
+                ";".join(d for d, _ in predictions),
+                ";".join(f"{s:.4f}" for _, s in predictions),
+            ])
+        else:
+            self.stream.write(json.dumps({
+                "id": case_id,
+                "symptoms": symptoms,
+                "predictions": [{"disease": d, "score": round(s, 4)} for d, s in predictions],
+            }) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch symptom-to-disease prediction.")
+    parser.add_argument("input", help="CSV/JSONL file, or '-' for stdin")
+    parser.add_argument("-o", "--output", default="-", help="CSV/JSONL file, or '-' for stdout")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"])
+    parser.add_argument("--output-format", choices=["csv", "jsonl"])
+    parser.add_argument("--id-column", default="id")
+    parser.add_argument("--symptoms-column", default="symptoms")
+    parser.add_argument("--top-n", type=int, default=3)
+    parser.add_argument("--min-score", type=float, default=0.0)
+    parser.add_argument("--chunk-size", type=int, default=BATCH_CHUNK_SIZE)
+    parser.add_argument("--mode", choices=SYMPTOM_MODES, default=SYMPTOM_MODE,
+                        help="rank by the match-score heuristic or the trained classifier")
+    args = parser.parse_args(argv)
+
+    in_fmt = detect_format(args.input, args.input_format)
+    out_fmt = detect_format(args.output, args.output_format)
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+
+    checker = SymptomChecker()
+    writer = CaseWriter(dst, out_fmt)
+    cases = read_cases(src, in_fmt, args.id_column, args.symptoms_column)
+    total = 0
+    try:
+        while True:
+            chunk = list(islice(cases, args.chunk_size))
+            if not chunk:
+                break
+            results = checker.predict_batch([s for _, s in chunk], args.top_n, args.min_score, args.chunk_size,
+                                            args.mode)
+            for (case_id, symptoms), predictions in zip(chunk, results):
+                writer.write(case_id, symptoms, predictions)
+            total += len(chunk)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+
+    print(f"[INFO] Scored {total} symptom sets.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+
+from benchmarks.workloads import fixture_documents
+
+
+# -------------------
+# Paths & Config
+# -------------------
+BENCH_CACHE_DIR = os.path.join("benchmarks", ".cache")
+FIXTURE_STAMP_FILE = "fixture.json"
+
+
+def _fixture_chunks(docs):
+    from langchain.docstore.document import Document
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    from build_langchain_kb import CHUNK_SIZE, CHUNK_OVERLAP
+    from utils.embedding_store import chunk_id
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    split_docs = splitter.split_documents([
+        Document(page_content=f"Source: Fixture\nTitle: {title}\n\n{text}", metadata={"source": "Fixture"})
+        for title, text in docs
+    ])
+    chunks = {}
+    for doc in split_docs:
+        chunks.setdefault(chunk_id(doc.page_content, doc.metadata), doc)
+    return chunks
+
+
+def build_fixture_index(index_dir: str, index_type: str = "flat", store_path: str = None) -> dict:
+    """
+    Chunks, embeds and publishes the fixture corpus exactly like the KB build.
+    Embeddings are reused from ``store_path`` when given; without it every chunk
+    is embedded again. Returns build statistics.
+    """
+    from langchain_community.embeddings import SentenceTransformerEmbeddings
+
+    from build_langchain_kb import EMBED_MODEL, build_full_index, build_manifest, publish_index
+    from utils.embedding_store import EmbeddingStore
+
+    start = time.perf_counter()
+    chunks = _fixture_chunks(fixture_documents())
+    chunked_s = time.perf_counter() - start
+
+    embedding_model = SentenceTransformerEmbeddings(model_name=EMBED_MODEL)
+    store = EmbeddingStore(EMBED_MODEL, store_path or ":memory:")
+    try:
+        db, index_type, params = build_full_index(chunks, store, embedding_model, index_type)
+        index_meta = {
+            "index_type": index_type,
+            "params": params,
+            "metric": "l2",
+            "dim": db.index.d,
+            "ntotal": db.index.ntotal,
+            "embed_model": EMBED_MODEL,
+        }
+        publish_index(db, index_dir, build_manifest(chunks), index_meta)
+    finally:
+        store.close()
+    return {"chunks": len(chunks), "chunk_s": chunked_s, "total_s": time.perf_counter() - start}
+
+
+def fixture_fingerprint(index_type: str) -> str:
+    from build_langchain_kb import CHUNK_SIZE, CHUNK_OVERLAP, EMBED_MODEL
+
+    payload = json.dumps([fixture_documents(), EMBED_MODEL, CHUNK_SIZE, CHUNK_OVERLAP, index_type])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def ensure_fixture_index(index_type: str = "flat", rebuild: bool = False) -> str:
+    """Returns the cached fixture index directory, building it on first use or when the corpus changed."""
+    index_dir = os.path.join(BENCH_CACHE_DIR, f"index_{index_type}")
+    stamp_path = os.path.join(index_dir, FIXTURE_STAMP_FILE)
+    fingerprint = fixture_fingerprint(index_type)
+    if not rebuild and os.path.exists(stamp_path):
+        with open(stamp_path, "r", encoding="utf-8") as f:
+            if json.load(f).get("fingerprint") == fingerprint:
+                return index_dir
+
+    print(f"[INFO] Building fixture index ({index_type}) in {index_dir} ...")
+    shutil.rmtree(index_dir, ignore_errors=True)
+    os.makedirs(BENCH_CACHE_DIR, exist_ok=True)
+    stats = build_fixture_index(index_dir, index_type, os.path.join(BENCH_CACHE_DIR, "embeddings.sqlite"))
+    with open(stamp_path, "w", encoding="utf-8") as f:
+        json.dump({"fingerprint": fingerprint, **stats}, f, indent=2)
+    return index_dir
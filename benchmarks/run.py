@@ -0,0 +1,219 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+# ---------------------------
+# MedBot benchmark runner
+# ---------------------------
+# Runs each suite in a fresh process (so cold start and peak RSS are per suite),
+# writes one JSON result file and optionally compares it with an earlier run.
+#
+#   python -m benchmarks.run --out bench/main.json
+#   python -m benchmarks.run --suites symptom_predict,retrieval --out bench/new.json --compare bench/main.json
+#   python -m benchmarks.run --diff bench/main.json bench/new.json
+
+_PROCESS_START = time.perf_counter()
+
+DEFAULT_CONFIG = {
+    "seed": 0,
+    "cases": 2000,
+    "batch_cases": 20000,
+    "batch_repeats": 5,
+    "queries": 200,
+    "prompts": 5000,
+    "e2e_requests": 100,
+    "e2e_clients": 16,
+    "llm_concurrency": 4,
+    "llm_first_token_s": 0.05,
+    "llm_token_s": 0.0,
+    "index_type": "flat",
+}
+QUICK_CONFIG = {"cases": 300, "batch_cases": 2000, "batch_repeats": 2, "queries": 40,
+                "prompts": 500, "e2e_requests": 30}
+
+# Metrics compared between runs; True means higher is better
+COMPARED_METRICS = {
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "throughput_ops": True,
+    "cold_start_s": False,
+    "peak_rss_mb": False,
+}
+REGRESSION_THRESHOLD = 0.10
+
+
+def peak_rss_mb() -> float:
+    import resource
+
+    # ru_maxrss survives exec on Linux (the child starts at the parent's peak),
+    # so prefer the high-water mark of this process's own address space.
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# -------------------
+# Child: one suite per process
+# -------------------
+def run_child(suite: str, cfg: dict) -> dict:
+    from benchmarks.suites import SUITES
+
+    marks = {}
+    metrics = SUITES[suite](cfg, lambda: marks.setdefault("ready", time.perf_counter()))
+    metrics["cold_start_s"] = marks.get("ready", time.perf_counter()) - _PROCESS_START
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    return metrics
+
+
+# -------------------
+# Parent
+# -------------------
+def run_suite(suite: str, cfg: dict, env: dict) -> dict:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-m", "benchmarks.run", "--child", suite, "--config", json.dumps(cfg)],
+        capture_output=True, text=True, env=env,
+    )
+    if proc.returncode != 0:
+        print(f"[WARN] Suite '{suite}' failed:\n{proc.stderr.strip()[-2000:]}")
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    metrics = json.loads(proc.stdout.strip().splitlines()[-1])
+    metrics["process_s"] = time.perf_counter() - start
+    return metrics
+
+
+def compare(baseline: dict, current: dict, threshold: float = REGRESSION_THRESHOLD) -> list:
+    """Returns rows of (suite, metric, old, new, change, regressed)."""
+    rows = []
+    for suite, metrics in current["suites"].items():
+        old_metrics = baseline.get("suites", {}).get(suite)
+        if not old_metrics or "error" in metrics or "error" in old_metrics:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = old_metrics.get(metric), metrics.get(metric)
+            if old is None or new is None or old == 0:
+                continue
+            change = (new - old) / old
+            regressed = (-change if higher_is_better else change) > threshold
+            rows.append((suite, metric, old, new, change, regressed))
+    return rows
+
+
+def format_comparison(rows: list) -> str:
+    lines = [f"{'suite':<16} {'metric':<15} {'before':>11} {'after':>11} {'change':>8}"]
+    for suite, metric, old, new, change, regressed in rows:
+        flag = "  ❌ regression" if regressed else ""
+        lines.append(f"{suite:<16} {metric:<15} {old:>11.3f} {new:>11.3f} {change:>+7.1%}{flag}")
+    return "\n".join(lines)
+
+
+def format_results(results: dict) -> str:
+    lines = [f"{'suite':<16} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'ops/s':>10} {'cold s':>7} {'RSS MB':>7}"]
+    for suite, m in results["suites"].items():
+        if "error" in m:
+            lines.append(f"{suite:<16} error: {m['error']}")
+            continue
+        lines.append(
+            f"{suite:<16} {m.get('p50_ms', 0):>9.3f} {m.get('p95_ms', 0):>9.3f} {m.get('p99_ms', 0):>9.3f} "
+            f"{m.get('throughput_ops', 0):>10.1f} {m['cold_start_s']:>7.2f} {m['peak_rss_mb']:>7.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from benchmarks.suites import SUITES, INDEX_SUITES
+
+    parser = argparse.ArgumentParser(description="MedBot performance benchmarks.")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"comma-separated: {', '.join(SUITES)}")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--diff", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two result files and exit")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="relative change counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--quick", action="store_true", help="smaller workloads for a fast smoke run")
+    parser.add_argument("--index-type", default=DEFAULT_CONFIG["index_type"])
+    parser.add_argument("--rebuild-fixture", action="store_true")
+    parser.add_argument("--seed", type=int, default=DEFAULT_CONFIG["seed"])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--config", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_child(args.child, json.loads(args.config))))
+        return
+
+    if args.diff:
+        with open(args.diff[0], encoding="utf-8") as f, open(args.diff[1], encoding="utf-8") as g:
+            rows = compare(json.load(f), json.load(g), args.threshold)
+        print(format_comparison(rows))
+        if args.fail_on_regression and any(r[-1] for r in rows):
+            sys.exit(1)
+        return
+
+    suites = [s.strip() for s in args.suites.split(",") if s.strip()]
+    unknown = [s for s in suites if s not in SUITES]
+    if unknown:
+        parser.error(f"unknown suites: {', '.join(unknown)}")
+
+    cfg = {**DEFAULT_CONFIG, **(QUICK_CONFIG if args.quick else {}),
+           "seed": args.seed, "index_type": args.index_type}
+    env = dict(os.environ)
+    if INDEX_SUITES & set(suites):
+        from benchmarks.fixture_index import ensure_fixture_index
+        env["MEDBOT_INDEX_DIR"] = ensure_fixture_index(args.index_type, args.rebuild_fixture)
+    env.setdefault("MEDBOT_RERANK", "0")
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": cfg,
+        "suites": {},
+    }
+    for suite in suites:
+        print(f"[INFO] Running {suite} ...")
+        results["suites"][suite] = run_suite(suite, cfg, env)
+
+    print("\n📊 Results")
+    print(format_results(results))
+    if args.out:
+        if os.path.dirname(args.out):
+            os.makedirs(os.path.dirname(args.out), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✅ Saved results to {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            rows = compare(json.load(f), results, args.threshold)
+        print(f"\n📈 Compared with {args.compare}")
+        print(format_comparison(rows))
+        if args.fail_on_regression and any(r[-1] for r in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
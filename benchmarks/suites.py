@@ -0,0 +1,171 @@
+import asyncio
+import time
+from functools import partial
+
+from benchmarks.workloads import symptom_workload, question_workload
+
+
+# -------------------
+# Timing helpers
+# -------------------
+def percentile(values, pct: float) -> float:
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def summarize(latencies, wall_s: float, ops: int = None) -> dict:
+    """Latency percentiles in ms plus throughput in operations per second."""
+    ops = len(latencies) if ops is None else ops
+    return {
+        "ops": ops,
+        "mean_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "throughput_ops": ops / wall_s if wall_s else 0.0,
+    }
+
+
+def timed_loop(fn, inputs, warmup: int = 5) -> dict:
+    for item in inputs[:warmup]:
+        fn(item)
+    latencies = []
+    start = time.perf_counter()
+    for item in inputs:
+        t = time.perf_counter()
+        fn(item)
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+# -------------------
+# Suites
+# -------------------
+# Each suite gets the config and a ``ready`` callback. Everything before
+# ``ready()`` (imports, model and index loading, one first operation) counts as
+# cold start. The runner executes every suite in a fresh process.
+
+def suite_symptom_predict(cfg: dict, ready, mode: str = "heuristic") -> dict:
+    from utils.symptom_checker import predict_diseases
+
+    cases = symptom_workload(cfg["cases"], seed=cfg["seed"])
+    predict_diseases(cases[0], top_n=3, mode=mode)
+    ready()
+    return timed_loop(lambda case: predict_diseases(case, top_n=3, mode=mode), cases)
+
+
+def suite_symptom_batch(cfg: dict, ready, mode: str = "heuristic") -> dict:
+    from utils.symptom_checker import predict_diseases_batch
+
+    cases = symptom_workload(cfg["batch_cases"], seed=cfg["seed"])
+    list(predict_diseases_batch(cases[:10], top_n=3, mode=mode))
+    ready()
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(cfg["batch_repeats"]):
+        t = time.perf_counter()
+        list(predict_diseases_batch(cases, top_n=3, mode=mode))
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies, time.perf_counter() - start, ops=len(cases) * cfg["batch_repeats"])
+
+
+def suite_retrieval(cfg: dict, ready) -> dict:
+    from utils.rag_retriever import retrieve_context
+
+    questions = question_workload(cfg["queries"], seed=cfg["seed"])
+    retrieve_context(questions[0])
+    ready()
+    # Distinct wording per call so the query-embedding cache does not hide model cost
+    return timed_loop(lambda q: retrieve_context(q), [f"{q} ({i})" for i, q in enumerate(questions)])
+
+
+def suite_retrieval_dense(cfg: dict, ready) -> dict:
+    from utils.rag_retriever import retrieve_context
+
+    questions = question_workload(cfg["queries"], seed=cfg["seed"])
+    retrieve_context(questions[0], hybrid=False)
+    ready()
+    return timed_loop(lambda q: retrieve_context(q, hybrid=False), [f"{q} ({i})" for i, q in enumerate(questions)])
+
+
+def suite_prompt_build(cfg: dict, ready) -> dict:
+    from prompts.prompt_templates import build_rag_prompt
+    from utils.rag_retriever import retrieve_context
+
+    questions = question_workload(min(cfg["queries"], 50), seed=cfg["seed"])
+    contexts = [(q, retrieve_context(q)[0]) for q in questions]
+    ready()
+    inputs = contexts * max(1, cfg["prompts"] // len(contexts))
+    return timed_loop(lambda qc: build_rag_prompt(*qc), inputs)
+
+
+def suite_end_to_end(cfg: dict, ready) -> dict:
+    from utils.llm_backends import FakeStreamingBackend
+    from utils.qa_engine import QAEngine
+
+    backend = FakeStreamingBackend(first_token_delay=cfg["llm_first_token_s"], token_delay=cfg["llm_token_s"])
+    engine = QAEngine(backend=backend, use_cache=False, use_answers=False,
+                      max_concurrency=cfg["llm_concurrency"])
+    questions = [f"{q} ({i})" for i, q in enumerate(question_workload(cfg["e2e_requests"], seed=cfg["seed"]))]
+
+    async def run():
+        await engine.answer("What is diabetes?")
+        ready()
+        latencies, ttfts = [], []
+
+        async def one(question):
+            start = time.perf_counter()
+            first = []
+            await engine.answer(question, on_piece=lambda _: first or first.append(time.perf_counter()))
+            latencies.append(time.perf_counter() - start)
+            ttfts.append((first[0] if first else time.perf_counter()) - start)
+
+        start = time.perf_counter()
+        gate = asyncio.Semaphore(cfg["e2e_clients"])
+
+        async def client(question):
+            async with gate:
+                await one(question)
+
+        await asyncio.gather(*(client(q) for q in questions))
+        metrics = summarize(latencies, time.perf_counter() - start)
+        metrics["ttft_p50_ms"] = percentile(ttfts, 50) * 1000
+        metrics["ttft_p95_ms"] = percentile(ttfts, 95) * 1000
+        return metrics
+
+    return asyncio.run(run())
+
+
+def suite_kb_build(cfg: dict, ready) -> dict:
+    import tempfile
+
+    from benchmarks.fixture_index import build_fixture_index
+
+    ready()
+    with tempfile.TemporaryDirectory() as tmp:
+        # No embedding store: chunking, embedding and indexing are all measured
+        stats = build_fixture_index(f"{tmp}/index", cfg["index_type"])
+    return {
+        "ops": stats["chunks"],
+        "total_s": stats["total_s"],
+        "chunk_s": stats["chunk_s"],
+        "throughput_ops": stats["chunks"] / stats["total_s"],
+    }
+
+
+SUITES = {
+    "symptom_predict": suite_symptom_predict,
+    "symptom_batch": suite_symptom_batch,
+    "symptom_model_predict": partial(suite_symptom_predict, mode="model"),
+    "symptom_model_batch": partial(suite_symptom_batch, mode="model"),
+    "retrieval": suite_retrieval,
+    "retrieval_dense": suite_retrieval_dense,
+    "prompt_build": suite_prompt_build,
+    "end_to_end": suite_end_to_end,
+    "kb_build": suite_kb_build,
+}
+
+# Suites that query the fixture index
+INDEX_SUITES = {"retrieval", "retrieval_dense", "prompt_build", "end_to_end"}
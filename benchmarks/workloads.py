@@ -0,0 +1,101 @@
+import random
+
+import pandas as pd
+
+from utils.symptom_checker import SYMPTOM_CSV
+
+
+# -------------------
+# Synthetic workloads
+# -------------------
+# Everything is derived from data/disease_symptom.csv with a fixed seed, so two
+# runs of the same commit score exactly the same inputs.
+
+QUESTION_TEMPLATES = [
+    "What are the symptoms of {disease}?",
+    "How is {disease} treated?",
+    "What causes {disease}?",
+    "When should I see a doctor about {disease}?",
+    "I have {symptom_a} and {symptom_b}, what could it be?",
+    "Is {symptom_a} a sign of {disease}?",
+]
+
+
+def load_symptom_table(path: str = SYMPTOM_CSV):
+    """Returns (symptom columns, [(disease, [symptoms present]), ...]) in CSV row order."""
+    df = pd.read_csv(path, dtype={"Disease": str})
+    columns = [col for col in df.columns if col.lower() != "disease"]
+    values = df[columns].to_numpy() == 1
+    rows = [(disease, [columns[j] for j in row.nonzero()[0]]) for disease, row in zip(df["Disease"], values)]
+    return columns, rows
+
+
+def symptom_workload(n: int, seed: int = 0, min_symptoms: int = 1, max_symptoms: int = 6,
+                     noise: float = 0.2) -> list:
+    """
+    ``n`` comma-separated symptom strings. Each case takes a random subset of one
+    CSV row's symptoms and, with probability ``noise``, one unrelated symptom.
+    """
+    rng = random.Random(seed)
+    columns, rows = load_symptom_table()
+    cases = []
+    for _ in range(n):
+        _, present = rng.choice(rows)
+        k = rng.randint(min(min_symptoms, len(present)), min(max_symptoms, len(present)))
+        symptoms = rng.sample(present, k)
+        if rng.random() < noise:
+            symptoms.append(rng.choice(columns))
+        cases.append(", ".join(s.strip() for s in symptoms))
+    return cases
+
+
+def question_workload(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    _, rows = load_symptom_table()
+    questions = []
+    for _ in range(n):
+        disease, present = rng.choice(rows)
+        symptom_a, symptom_b = (rng.sample(present, 2) if len(present) > 1 else present * 2)
+        questions.append(rng.choice(QUESTION_TEMPLATES).format(
+            disease=disease,
+            symptom_a=symptom_a.strip().replace("_", " "),
+            symptom_b=symptom_b.strip().replace("_", " "),
+        ))
+    return questions
+
+
+# -------------------
+# Fixture corpus
+# -------------------
+def fixture_documents(seed: int = 0, filler_per_disease: int = 3) -> list:
+    """
+    Small MedlinePlus-like corpus: one topic per disease built from its CSV
+    symptoms, plus filler topics so the index holds a few hundred chunks.
+    Returns ``[(title, text), ...]``.
+    """
+    rng = random.Random(seed)
+    columns, rows = load_symptom_table()
+    by_disease = {}
+    for disease, present in rows:
+        by_disease.setdefault(disease, set()).update(s.strip().replace("_", " ") for s in present)
+
+    vocabulary = [c.strip().replace("_", " ") for c in columns]
+    docs = []
+    for disease, symptoms in sorted(by_disease.items()):
+        symptoms = sorted(symptoms)
+        docs.append((disease, (
+            f"{disease} is a condition that is often recognised by {', '.join(symptoms[:-1]) or symptoms[0]}"
+            f"{' and ' + symptoms[-1] if len(symptoms) > 1 else ''}.\n\n"
+            f"Symptoms of {disease} can include {', '.join(symptoms)}. Not everyone has all of them, "
+            f"and they may come and go.\n\n"
+            f"Treatment of {disease} depends on the cause and how severe the symptoms are. "
+            f"See a doctor if {symptoms[0]} gets worse or does not improve, or in an emergency."
+        )))
+        for i in range(filler_per_disease):
+            words = rng.sample(vocabulary, min(len(vocabulary), 40))
+            docs.append((f"{disease} notes {i + 1}", (
+                f"Patients with {disease} sometimes report " + ", ".join(words[:20]) + ". "
+                "Other reported problems include " + ", ".join(words[20:]) + ". "
+                "A health professional can help decide which tests are needed."
+            )))
+    return docs
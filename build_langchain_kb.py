@@ -1,14 +1,35 @@
+import argparse
+import json
+import multiprocessing
 import os
+import queue
+import shutil
+import threading
+import time
 import zipfile
 import xml.etree.ElementTree as ET
 from html import unescape
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
-from langchain_community.document_loaders import PyPDFLoader
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain_community.embeddings import SentenceTransformerEmbeddings
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain.docstore.document import Document
+import numpy as np
+
+from utils.answer_store import ANSWER_STORE_PATH
+from utils.bm25 import BM25_FILE, BM25Index
+from utils.embedding_store import EmbeddingStore, chunk_id
+from utils.pdf_extract import extract_pages, plan_pdf_shards
+from utils.chunk_store import CHUNK_STORE_FILE, write_chunk_store
+from utils.file_utils import file_lock, make_build_dir, publish_build_dir, resolve_build_dir
+from utils.faiss_index import (
+    INDEX_META_FILE, INDEX_TYPES, build_index, compare_index_types, format_report, read_index_meta,
+    write_index_meta,
+)
 
 # ---------------------------
 # File paths
@@ -17,16 +38,78 @@ DATA_DIR = "data"
 ENCYCLOPEDIA_PDF_PATH = os.path.join(DATA_DIR, "encyclopedia.pdf")
 MEDLINEPLUS_ZIP_PATH = os.path.join(DATA_DIR, "medlineplus_health_topics.zip")
 FAISS_INDEX_DIR = os.path.join(DATA_DIR, "langchain_index")
+MANIFEST_FILE = "manifest.json"
+INDEX_REPORT_FILE = "index_report.json"
+INDEX_LOCK_FILE = ".lock"
+# Files of the old unversioned layout, written straight into the index directory
+LEGACY_INDEX_FILES = ("index.faiss", "index.pkl", CHUNK_STORE_FILE, BM25_FILE, MANIFEST_FILE, INDEX_META_FILE)
+EMBED_MODEL = "all-MiniLM-L6-v2"
+
+# ---------------------------
+# Pipeline defaults
+# ---------------------------
+CHUNK_SIZE = 700
+CHUNK_OVERLAP = 100
+DEFAULT_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+DEFAULT_EMBED_BATCH = 256
+DEFAULT_QUEUE_BATCHES = 8
+PROGRESS_INTERVAL = 5.0
+DOCS_PER_MESSAGE = 256
+WORKER_QUEUE_MESSAGES = 64
 
 # ---------------------------
 # Load MedlinePlus from ZIP
 # ---------------------------
-def load_medlineplus_zip(zip_path, max_chars=750, min_chars=80, limit=None):
+def iter_medlineplus_xml(f, max_chars=750, min_chars=80):
+    """
+    Streams MedlinePlus documents out of one XML file with iterparse.
+    Each <health-topic> is cleared once read and finished top-level elements
+    are dropped from the root, so memory stays flat however large the dump is.
+    """
+    root = None
+    ns = ""
+    depth = 0
+    for event, elem in ET.iterparse(f, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+                ns = elem.tag.split("}")[0] + "}" if elem.tag.startswith("{") else ""
+            depth += 1
+            continue
+
+        depth -= 1
+        if elem.tag == f"{ns}health-topic":
+            doc = _health_topic_doc(elem, ns, max_chars, min_chars)
+            elem.clear()
+            if doc is not None:
+                yield doc
+        if depth == 1:
+            root.clear()
+
+def _health_topic_doc(topic, ns, max_chars, min_chars):
+    def get(el_name):
+        el = topic.find(f"{ns}{el_name}")
+        return el.text.strip() if el is not None and el.text else ""
+
+    lang = get("language").lower() or "en"
+    if lang != "en":
+        return None
+
+    title = get("title") or "Unknown Topic"
+    summary = get("full-summary")
+    summary = unescape(summary or "").replace("\n", " ").strip()
+
+    if len(summary) < min_chars:
+        return None
+
+    text = f"Source: MedlinePlus\nTitle: {title}\n\n{summary[:max_chars]}..."
+    return Document(page_content=text, metadata={"source": "MedlinePlus"})
+
+def iter_medlineplus_zip(zip_path, max_chars=750, min_chars=80, limit=None):
     if not os.path.exists(zip_path):
         print("⚠ MedlinePlus ZIP not found.")
-        return []
+        return
 
-    docs = []
     with zipfile.ZipFile(zip_path, "r") as z:
         xml_files = [f for f in z.namelist() if f.lower().endswith(".xml")]
         print(f"[INFO] Found {len(xml_files)} XML files in MedlinePlus ZIP.")
@@ -37,78 +120,449 @@ def load_medlineplus_zip(zip_path, max_chars=750, min_chars=80, limit=None):
 
             try:
                 with z.open(xml_file) as f:
-                    tree = ET.parse(f)
-                    root = tree.getroot()
-                    ns = {"m": root.tag.split("}")[0][1:]} if root.tag.startswith("{") else {}
+                    yield from iter_medlineplus_xml(f, max_chars, min_chars)
+            except Exception as e:
+                print(f"[SKIP] Failed to parse {xml_file}: {e}")
+
+def load_medlineplus_zip(zip_path, max_chars=750, min_chars=80, limit=None):
+    docs = list(iter_medlineplus_zip(zip_path, max_chars, min_chars, limit))
+    print(f"[INFO] Loaded {len(docs)} MedlinePlus documents.")
+    return docs
+
+# ---------------------------
+# Load Medical Encyclopedia PDF
+# ---------------------------
+def encyclopedia_page_docs(pages):
+    # "page" is 0-based like PyPDFLoader's; citations show it as "p. N"
+    return [
+        Document(page_content=text, metadata={"source": "MedicalEncyclopedia", "page": page})
+        for page, text in pages if text.strip()
+    ]
+
+def load_encyclopedia_pdf(pdf_path):
+    pdf_hash, shards = plan_pdf_shards(pdf_path)
+    return [doc for start, end in shards
+            for doc in encyclopedia_page_docs(extract_pages(pdf_path, pdf_hash, start, end))]
+
+# ---------------------------
+# Parse + chunk tasks (run in worker processes)
+# ---------------------------
+def list_source_tasks():
+    """
+    One task per MedlinePlus XML member plus one per page range of the
+    encyclopedia PDF, so large PDFs are extracted by several workers.
+    """
+    tasks = []
+    if os.path.exists(MEDLINEPLUS_ZIP_PATH):
+        with zipfile.ZipFile(MEDLINEPLUS_ZIP_PATH, "r") as z:
+            xml_files = [f for f in z.namelist() if f.lower().endswith(".xml")]
+        print(f"[INFO] Found {len(xml_files)} XML files in MedlinePlus ZIP.")
+        tasks += [("medlineplus", MEDLINEPLUS_ZIP_PATH, name) for name in xml_files]
+    else:
+        print("⚠ MedlinePlus ZIP not found.")
+    if os.path.exists(ENCYCLOPEDIA_PDF_PATH):
+        pdf_hash, shards = plan_pdf_shards(ENCYCLOPEDIA_PDF_PATH)
+        print(f"[INFO] Encyclopedia PDF: {shards[-1][1] if shards else 0} pages in {len(shards)} shards.")
+        tasks += [("pdf", ENCYCLOPEDIA_PDF_PATH, (pdf_hash, start, end)) for start, end in shards]
+    return tasks
+
+def iter_task_chunks(task):
+    """Yields lists of chunks for one source task, at most DOCS_PER_MESSAGE documents at a time."""
+    kind, path, member = task
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    if kind == "medlineplus":
+        try:
+            with zipfile.ZipFile(path, "r") as z, z.open(member) as f:
+                docs = iter_medlineplus_xml(f)
+                while True:
+                    batch = list(islice(docs, DOCS_PER_MESSAGE))
+                    if not batch:
+                        break
+                    yield splitter.split_documents(batch)
+        except Exception as e:
+            print(f"[SKIP] Failed to parse {member}: {e}")
+    else:
+        # Page text comes from the on-disk page cache when this PDF was extracted before
+        pdf_hash, start, end = member
+        yield splitter.split_documents(encyclopedia_page_docs(extract_pages(path, pdf_hash, start, end)))
+
+_worker_queue = None
+
+def _init_worker(results_queue):
+    global _worker_queue
+    _worker_queue = results_queue
 
-                    topics = root.findall(".//m:health-topic", ns) if ns else root.findall(".//health-topic")
-                    if not topics:
-                        continue
+def _run_task_to_queue(task):
+    try:
+        for chunks in iter_task_chunks(task):
+            _worker_queue.put(("chunks", chunks))
+    finally:
+        _worker_queue.put(("done", None))
 
-                    for topic in topics:
-                        def get(el_name):
-                            el = topic.find(f"m:{el_name}", ns) if ns else topic.find(el_name)
-                            return el.text.strip() if el is not None and el.text else ""
+def iter_chunk_batches(tasks, workers):
+    """
+    Yields ``(task_finished, chunks)`` as sources are parsed. With workers > 1 the
+    tasks run in a process pool that streams chunk batches back through a bounded
+    queue, so no worker ever holds a whole parsed source in memory.
+    """
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            for chunks in iter_task_chunks(task):
+                yield False, chunks
+            yield True, []
+        return
 
-                        lang = get("language").lower() or "en"
-                        if lang != "en":
-                            continue
+    results_queue = multiprocessing.Queue(maxsize=WORKER_QUEUE_MESSAGES)
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker,
+                             initargs=(results_queue,)) as pool:
+        futures = [pool.submit(_run_task_to_queue, task) for task in tasks]
+        remaining = len(tasks)
+        while remaining:
+            try:
+                kind, chunks = results_queue.get(timeout=1.0)
+            except queue.Empty:
+                # Surface worker crashes instead of waiting forever
+                for future in futures:
+                    if future.done() and future.exception() is not None:
+                        raise future.exception()
+                continue
+            if kind == "done":
+                remaining -= 1
+                yield True, []
+            else:
+                yield False, chunks
+        for future in futures:
+            future.result()
+
+# ---------------------------
+# Embedding pipeline
+# ---------------------------
+class BuildProgress:
+    def __init__(self, total_tasks):
+        self.start = time.perf_counter()
+        self.total_tasks = total_tasks
+        self.tasks_done = 0
+        self.chunks_seen = 0
+        self.chunks_embedded = 0
+        self._last_report = self.start
+        self._lock = threading.Lock()
+
+    def add(self, tasks=0, seen=0, embedded=0):
+        with self._lock:
+            self.tasks_done += tasks
+            self.chunks_seen += seen
+            self.chunks_embedded += embedded
+            now = time.perf_counter()
+            if now - self._last_report >= PROGRESS_INTERVAL:
+                self._last_report = now
+                self.report()
+
+    def report(self, final=False):
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        label = "Done" if final else "Progress"
+        print(f"[{label}] sources {self.tasks_done}/{self.total_tasks} | "
+              f"chunks {self.chunks_seen} | embedded {self.chunks_embedded} "
+              f"({self.chunks_embedded / elapsed:.1f} chunks/sec) | {elapsed:.1f}s")
+
+class EmbeddingPipeline:
+    """
+    Background embedder fed through a bounded queue. Producers block when
+    ``queue_batches`` batches are waiting, which keeps memory flat while
+    parsing runs ahead of embedding.
+    """
+
+    def __init__(self, embedding_model, store, progress, batch_size=DEFAULT_EMBED_BATCH,
+                 queue_batches=DEFAULT_QUEUE_BATCHES):
+        self.embedding_model = embedding_model
+        self.store = store
+        self.progress = progress
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=queue_batches)
+        self._pending = []
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="embedder", daemon=True)
 
-                        title = get("title") or "Unknown Topic"
-                        summary = get("full-summary")
-                        summary = unescape(summary or "").replace("\n", " ").strip()
+    def __enter__(self):
+        self._thread.start()
+        return self
 
-                        if len(summary) < min_chars:
-                            continue
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        self._queue.put(None)
+        self._thread.join()
+        if exc_type is None and self._error is not None:
+            raise self._error
 
-                        text = f"Source: MedlinePlus\nTitle: {title}\n\n{summary[:max_chars]}..."
-                        docs.append(Document(page_content=text, metadata={"source": "MedlinePlus"}))
+    def submit(self, cid, text):
+        self._pending.append((cid, text))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
 
+    def flush(self):
+        if self._error is not None:
+            raise self._error
+        if self._pending:
+            self._queue.put(self._pending)
+            self._pending = []
+
+    def _run(self):
+        while True:
+            batch = self._queue.get()
+            if batch is None:
+                return
+            if self._error is not None:
+                continue
+            try:
+                vectors = self.embedding_model.embed_documents([text for _, text in batch])
+                self.store.put_many(zip([cid for cid, _ in batch], vectors))
+                self.progress.add(embedded=len(batch))
             except Exception as e:
-                print(f"[SKIP] Failed to parse {xml_file}: {e}")
+                self._error = e
 
-    print(f"[INFO] Loaded {len(docs)} MedlinePlus documents.")
-    return docs
+def collect_chunks(tasks, embedding_model, store, args):
+    """
+    Parses and chunks all sources in parallel while embedding chunks that are
+    not yet in the store. Returns the content-hashed chunk dict.
+    """
+    progress = BuildProgress(len(tasks))
+    chunks = {}
+    with EmbeddingPipeline(embedding_model, store, progress, args.batch_size, args.queue_batches) as pipeline:
+        for task_finished, split_docs in iter_chunk_batches(tasks, args.workers):
+            new_ids = []
+            # Content-hash chunks (identical chunks collapse into one entry)
+            for doc in split_docs:
+                cid = chunk_id(doc.page_content, doc.metadata)
+                if cid not in chunks:
+                    chunks[cid] = doc
+                    new_ids.append(cid)
+            for cid in store.missing(new_ids):
+                pipeline.submit(cid, chunks[cid].page_content)
+            progress.add(tasks=int(task_finished), seen=len(new_ids))
+    progress.report(final=True)
+    return chunks
+
+# ---------------------------
+# Manifest
+# ---------------------------
+def load_manifest(index_dir):
+    path = os.path.join(index_dir, MANIFEST_FILE)
+    if not os.path.exists(path) or not os.path.exists(os.path.join(index_dir, "index.faiss")):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def build_manifest(chunks):
+    return {
+        "embed_model": EMBED_MODEL,
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "chunks": {cid: doc.metadata.get("source", "Unknown") for cid, doc in chunks.items()},
+    }
+
+# ---------------------------
+# Publish index
+# ---------------------------
+def publish_index(db, index_dir, manifest=None, index_meta=None):
+    """
+    Writes every index file into a new build directory under ``index_dir`` and
+    then switches its CURRENT pointer in one rename (see ``utils.file_utils``),
+    so a running retriever sees either the old build or the new one, never a
+    mix of both. Concurrent builds publish one after the other.
+    """
+    with file_lock(os.path.join(index_dir, INDEX_LOCK_FILE)):
+        build_dir = make_build_dir(index_dir)
+        try:
+            db.save_local(build_dir)
+            # Read-only layout for the retriever: index.faiss is memory-mapped and chunk
+            # texts are looked up by row in SQLite, so worker processes share one copy.
+            write_chunk_store(os.path.join(build_dir, CHUNK_STORE_FILE), db.index_to_docstore_id, db.docstore)
+            # Keyword index for hybrid retrieval; document ids are FAISS row positions
+            positions = sorted(db.index_to_docstore_id.items())
+            bm25 = BM25Index.build(db.docstore.search(cid).page_content for _, cid in positions)
+            bm25.save(os.path.join(build_dir, BM25_FILE))
+            if manifest is not None:
+                with open(os.path.join(build_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+                    json.dump(manifest, f)
+            if index_meta is not None:
+                write_index_meta(build_dir, index_meta)
+        except BaseException:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            raise
+        publish_build_dir(index_dir, build_dir)
+        # An index from before versioned builds is superseded now
+        for name in LEGACY_INDEX_FILES:
+            if os.path.exists(os.path.join(index_dir, name)):
+                os.remove(os.path.join(index_dir, name))
+
+# ---------------------------
+# Embeddings (content-hashed)
+# ---------------------------
+def embed_chunks(chunks, ids, store, embedding_model):
+    """Returns vectors for ``ids``, embedding only chunks missing from the store."""
+    vectors = store.get_many(ids)
+    missing = [cid for cid in ids if cid not in vectors]
+    if missing:
+        print(f"[INFO] Embedding {len(missing)} new/changed chunks ({len(ids) - len(missing)} reused).")
+        new_vectors = embedding_model.embed_documents([chunks[cid].page_content for cid in missing])
+        store.put_many(zip(missing, new_vectors))
+        vectors.update(zip(missing, new_vectors))
+    return np.asarray([vectors[cid] for cid in ids], dtype=np.float32)
+
+def build_full_index(chunks, store, embedding_model, index_type="flat", params=None):
+    """Builds a fresh index of the requested type. Returns (db, index_type, params)."""
+    ids = list(chunks)
+    vectors = embed_chunks(chunks, ids, store, embedding_model)
+    index, index_type, params = build_index(vectors, index_type, params)
+    db = FAISS(
+        embedding_function=embedding_model,
+        index=index,
+        docstore=InMemoryDocstore({cid: chunks[cid] for cid in ids}),
+        index_to_docstore_id=dict(enumerate(ids)),
+    )
+    return db, index_type, params
+
+def update_index(db, chunks, old_ids, store, embedding_model):
+    """Applies the chunk diff to a loaded index. Returns (added, removed) counts."""
+    removed = [cid for cid in old_ids if cid not in chunks]
+    added = [cid for cid in chunks if cid not in old_ids]
+    if removed:
+        db.delete(removed)
+    if added:
+        vectors = embed_chunks(chunks, added, store, embedding_model)
+        db.add_embeddings(
+            [(chunks[cid].page_content, vec.tolist()) for cid, vec in zip(added, vectors)],
+            metadatas=[chunks[cid].metadata for cid in added],
+            ids=added,
+        )
+    return len(added), len(removed)
 
 # ---------------------------
 # Main Build Pipeline
 # ---------------------------
-def main():
-    docs = []
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the LangChain FAISS knowledge base.")
+    parser.add_argument("--full", action="store_true",
+                        help="Rebuild the whole index instead of applying the chunk diff.")
+    parser.add_argument("--prune-store", action="store_true",
+                        help="Drop cached embeddings of chunks no longer in the corpus.")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help="Processes used for parsing and chunking (1 = in-process).")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_EMBED_BATCH,
+                        help="Chunks per embedding batch.")
+    parser.add_argument("--queue-batches", type=int, default=DEFAULT_QUEUE_BATCHES,
+                        help="Embedding batches allowed to wait in the queue.")
 
-    # Load MedlinePlus
-    med_docs = load_medlineplus_zip(MEDLINEPLUS_ZIP_PATH)
-    docs += med_docs
+    index = parser.add_argument_group("index type")
+    index.add_argument("--index-type", choices=INDEX_TYPES, default="flat",
+                       help="flat (exact), hnsw (graph), ivfpq (compressed) or sq8 (int8 scalar-quantized).")
+    index.add_argument("--hnsw-m", type=int, help="HNSW neighbours per node.")
+    index.add_argument("--ef-construction", type=int, help="HNSW build-time search depth.")
+    index.add_argument("--ef-search", type=int, help="HNSW query-time search depth.")
+    index.add_argument("--nlist", type=int, help="IVF-PQ number of clusters (default: 4*sqrt(n)).")
+    index.add_argument("--pq-m", type=int, help="IVF-PQ sub-quantizers (must divide the embedding dim).")
+    index.add_argument("--nbits", type=int, help="IVF-PQ bits per sub-quantizer code.")
+    index.add_argument("--nprobe", type=int, help="IVF-PQ clusters visited per query.")
+    index.add_argument("--report", action="store_true",
+                       help="Compare recall@k, latency and memory of all index types against flat.")
+    return parser.parse_args(argv)
 
-    # Load Medical Encyclopedia PDF
-    if os.path.exists(ENCYCLOPEDIA_PDF_PATH):
-        pdf_loader = PyPDFLoader(ENCYCLOPEDIA_PDF_PATH)
-        encyclopedia_docs = pdf_loader.load()
-        for doc in encyclopedia_docs:
-            doc.metadata["source"] = "MedicalEncyclopedia"
-        docs += encyclopedia_docs
+def index_params_from_args(args):
+    return {
+        "hnsw": {"m": args.hnsw_m, "ef_construction": args.ef_construction, "ef_search": args.ef_search},
+        "ivfpq": {"nlist": args.nlist, "pq_m": args.pq_m, "nbits": args.nbits, "nprobe": args.nprobe},
+    }
+
+def run_index_report(chunks, store, index_params, k=10):
+    found = store.get_many(list(chunks))
+    vectors = np.asarray(list(found.values()), dtype=np.float32)
+    rows = compare_index_types(vectors, k=k, params=index_params)
+    print("\n📊 Index comparison (recall against exact flat search):")
+    print(format_report(rows))
+    with open(os.path.join(FAISS_INDEX_DIR, INDEX_REPORT_FILE), "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+
+def main(argv=None):
+    args = parse_args(argv)
+    start = time.perf_counter()
 
-    if not docs:
+    tasks = list_source_tasks()
+    if not tasks:
         raise SystemExit("❌ No documents found. Check all data sources.")
 
-    # Chunk documents
-    splitter = RecursiveCharacterTextSplitter(chunk_size=700, chunk_overlap=100)
-    split_docs = splitter.split_documents(docs)
+    # Parse, chunk and embed (parallel parsing, batched background embedding)
+    embedding_model = SentenceTransformerEmbeddings(
+        model_name=EMBED_MODEL, encode_kwargs={"batch_size": args.batch_size}
+    )
+    store = EmbeddingStore(EMBED_MODEL)
+    chunks = collect_chunks(tasks, embedding_model, store, args)
+    if not chunks:
+        store.close()
+        raise SystemExit("❌ No documents found. Check all data sources.")
 
     # Count chunks per source
-    source_counts = Counter(doc.metadata.get("source", "Unknown") for doc in split_docs)
+    source_counts = Counter(doc.metadata.get("source", "Unknown") for doc in chunks.values())
+
+    # Build or update the index
+    index_params = index_params_from_args(args)
+    requested = {"index_type": args.index_type, "params": index_params.get(args.index_type, {})}
+    live_dir = resolve_build_dir(FAISS_INDEX_DIR)
+    manifest = None if args.full else load_manifest(live_dir)
+    current = read_index_meta(live_dir) if manifest else None
+    # Compare with what the last build was asked for, so an IVF-PQ request that fell
+    # back to flat (too few vectors) still matches the same request next time
+    built_for = (current or {}).get("requested") or current
+    same_index = built_for is not None and built_for.get("index_type") == args.index_type and all(
+        v is None or built_for.get("params", {}).get(k) == v for k, v in requested["params"].items()
+    )
+    if manifest and manifest.get("embed_model") == EMBED_MODEL and same_index:
+        old_ids = set(manifest["chunks"])
+        if old_ids == set(chunks) and os.path.exists(os.path.join(live_dir, BM25_FILE)):
+            print(f"\n✅ Index is up to date ({len(chunks)} chunks, {time.perf_counter() - start:.1f}s).")
+            if args.report:
+                run_index_report(chunks, store, index_params)
+            store.close()
+            return
+    else:
+        manifest = None
+
+    if manifest and args.index_type == "flat":
+        db = FAISS.load_local(live_dir, embedding_model, allow_dangerous_deserialization=True)
+        added, removed = update_index(db, chunks, set(manifest["chunks"]), store, embedding_model)
+        print(f"[INFO] Incremental update: +{added} / -{removed} chunks.")
+        index_type, params = "flat", {}
+    else:
+        # Graph and quantized indexes cannot drop vectors in place; rebuild them
+        # from the embedding store (only new chunks are actually embedded).
+        db, index_type, params = build_full_index(
+            chunks, store, embedding_model, args.index_type, index_params.get(args.index_type)
+        )
+    index_meta = {
+        "index_type": index_type,
+        "params": params,
+        "metric": "l2",
+        "dim": db.index.d,
+        "ntotal": db.index.ntotal,
+        "embed_model": EMBED_MODEL,
+        "requested": requested,
+    }
+    publish_index(db, FAISS_INDEX_DIR, build_manifest(chunks), index_meta)
+    print(f"[INFO] Index type: {index_type} {params}")
 
-    # Build embeddings
-    embedding_model = SentenceTransformerEmbeddings(model_name="all-MiniLM-L6-v2")
-    db = FAISS.from_documents(split_docs, embedding_model)
-    db.save_local(FAISS_INDEX_DIR)
+    if args.report:
+        run_index_report(chunks, store, index_params)
+    if args.prune_store:
+        print(f"[INFO] Pruned {store.prune(chunks)} stale embeddings.")
+    store.close()
 
     # Report
     print(f"\n✅ LangChain FAISS index saved to: {FAISS_INDEX_DIR}")
-    print(f"📦 Total chunks: {len(split_docs)}")
+    print(f"📦 Total chunks: {len(chunks)}")
     print("🔍 Chunks by source:")
     for source, count in source_counts.items():
         print(f"  - {source}: {count}")
+    print(f"⏱ Build time: {time.perf_counter() - start:.1f}s")
+    if os.path.exists(ANSWER_STORE_PATH):
+        print("[INFO] Precomputed answers belong to the previous build; rerun precompute_answers.py.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,128 @@
+import argparse
+import csv
+import json
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.suites import summarize
+from utils.symptom_artifact import SYMPTOM_CSV
+from utils.symptom_checker import SymptomChecker
+from utils.symptom_model import MODEL_KINDS
+
+# ---------------------------
+# Heuristic vs trained symptom model
+# ---------------------------
+# Splits disease_symptom.csv into train and held-out rows per disease, builds
+# the Jaccard heuristic and every model kind from the training rows only, and
+# scores partial symptom sets sampled from the held-out rows: top-1/top-3
+# accuracy, per-case latency and batch throughput for each method.
+#
+#   python compare_symptom_models.py
+#   python compare_symptom_models.py --test-frac 0.3 --samples 20 --json results.json
+
+
+def split_rows(path: str, test_frac: float, seed: int):
+    """(header, disease column, train rows, test rows); every disease keeps a training row."""
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+    disease_col = next(i for i, col in enumerate(header) if col.strip().lower() == "disease")
+
+    by_disease = {}
+    for row in rows:
+        by_disease.setdefault(row[disease_col], []).append(row)
+    rng = random.Random(seed)
+    train, test = [], []
+    for group in by_disease.values():
+        rng.shuffle(group)
+        n_test = min(len(group) - 1, round(len(group) * test_frac))
+        test += group[:n_test]
+        train += group[n_test:]
+    return header, disease_col, train, test
+
+
+def held_out_cases(header, disease_col, rows, samples: int, seed: int):
+    """Each held-out row's full symptom set plus ``samples`` random subsets of it, with the true disease."""
+    rng = random.Random(seed)
+    cases = []
+    for row in rows:
+        present = [header[j] for j, value in enumerate(row) if j != disease_col and value.strip() == "1"]
+        if not present:
+            continue
+        cases.append((present, row[disease_col]))
+        for _ in range(samples):
+            cases.append((rng.sample(present, rng.randint(1, len(present))), row[disease_col]))
+    return cases
+
+
+def evaluate(checker, cases, mode: str, repeats: int) -> dict:
+    hits1 = hits3 = 0
+    latencies = []
+    for symptoms, disease in cases:
+        t = time.perf_counter()
+        ranked = [d for d, _ in next(checker.predict_batch([symptoms], top_n=3, mode=mode))]
+        latencies.append(time.perf_counter() - t)
+        hits1 += bool(ranked) and ranked[0] == disease
+        hits3 += disease in ranked
+
+    batch_latencies = []
+    start = time.perf_counter()
+    for _ in range(repeats):
+        t = time.perf_counter()
+        list(checker.predict_batch([s for s, _ in cases], top_n=3, mode=mode))
+        batch_latencies.append(time.perf_counter() - t)
+    batch = summarize(batch_latencies, time.perf_counter() - start, ops=len(cases) * repeats)
+
+    single = summarize(latencies, sum(latencies))
+    return {
+        "top1": hits1 / len(cases),
+        "top3": hits3 / len(cases),
+        "p50_ms": single["p50_ms"],
+        "p95_ms": single["p95_ms"],
+        "batch_throughput_ops": batch["throughput_ops"],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the symptom heuristic with the trained models.")
+    parser.add_argument("--csv", default=SYMPTOM_CSV)
+    parser.add_argument("--test-frac", type=float, default=0.2, help="share of each disease's rows held out")
+    parser.add_argument("--samples", type=int, default=10, help="random symptom subsets per held-out row")
+    parser.add_argument("--repeats", type=int, default=5, help="batch passes for the throughput figure")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    header, disease_col, train, test = split_rows(args.csv, args.test_frac, args.seed)
+    cases = held_out_cases(header, disease_col, test, args.samples, args.seed)
+    print(f"[INFO] {len(train)} training rows, {len(test)} held-out rows, {len(cases)} cases")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        train_csv = os.path.join(tmp, "train.csv")
+        with open(train_csv, "w", newline="", encoding="utf-8") as f:
+            csv.writer(f).writerows([header, *train])
+        artifact_dir, model_dir = os.path.join(tmp, "artifact"), os.path.join(tmp, "model")
+
+        checker = SymptomChecker(train_csv, artifact_dir, model_dir)
+        results["heuristic"] = evaluate(checker, cases, "heuristic", args.repeats)
+        for kind in MODEL_KINDS:
+            checker = SymptomChecker(train_csv, artifact_dir, model_dir, model_kind=kind)
+            checker.model()  # train outside the timed loop
+            results[kind] = evaluate(checker, cases, "model", args.repeats)
+
+    print(f"\n{'method':<10} {'top-1':>7} {'top-3':>7} {'p50 ms':>8} {'p95 ms':>8} {'batch ops/s':>12}")
+    for method, r in results.items():
+        print(f"{method:<10} {r['top1']:>7.1%} {r['top3']:>7.1%} {r['p50_ms']:>8.3f} {r['p95_ms']:>8.3f} "
+              f"{r['batch_throughput_ops']:>12.0f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "cases": len(cases), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
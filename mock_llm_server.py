@@ -0,0 +1,147 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from utils.llm_backends import FakeStreamingBackend, HTTP_LLM_URL
+
+# ---------------------------
+# Mock LLM HTTP server
+# ---------------------------
+# Offline stand-in for the LLM API, used with MEDBOT_LLM_BACKEND=http and the
+# Q&A load test. Streams canned answers with configurable latency and failures.
+#
+#   python mock_llm_server.py --port 8808 --first-token-delay 0.5 --error-rate 0.05
+#
+# POST /stream   {"prompt": "..."}  ->  one {"text": "..."} JSON object per line
+# GET  /stats    request counts and peak concurrent requests
+
+
+class MockLLMState:
+    def __init__(self, first_token_delay=0.3, token_delay=0.02, words_per_chunk=3,
+                 error_rate=0.0, hang_rate=0.0, hang_seconds=120.0, seed=None):
+        self.backend = FakeStreamingBackend(
+            first_token_delay=first_token_delay, token_delay=token_delay, words_per_chunk=words_per_chunk
+        )
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.active = 0
+        self.peak_active = 0
+
+    def enter(self):
+        with self.lock:
+            self.requests += 1
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            roll = self.random.random()
+        return roll
+
+    def leave(self):
+        with self.lock:
+            self.active -= 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"requests": self.requests, "errors": self.errors,
+                    "active": self.active, "peak_active": self.peak_active}
+
+
+class MockLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send_json(200, self.state.stats())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/stream":
+            self._send_json(404, {"error": "not found"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        prompt = json.loads(self.rfile.read(length) or b"{}").get("prompt", "")
+
+        state = self.state
+        roll = state.enter()
+        try:
+            if roll < state.error_rate:
+                with state.lock:
+                    state.errors += 1
+                self._send_json(503, {"error": "overloaded"})
+                return
+            if roll < state.error_rate + state.hang_rate:
+                time.sleep(state.hang_seconds)
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for piece in state.backend.stream(prompt):
+                line = (json.dumps({"text": piece}) + "\n").encode("utf-8")
+                self.wfile.write(f"{len(line):X}\r\n".encode("ascii") + line + b"\r\n")
+                self.wfile.flush()
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            state.leave()
+
+
+def start_mock_server(host="127.0.0.1", port=0, **options):
+    """Starts the server in a daemon thread. Returns (server, base_url)."""
+    handler = type("Handler", (MockLLMHandler,), {"state": MockLLMState(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-llm", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def main(argv=None):
+    default_port = int(HTTP_LLM_URL.rsplit(":", 1)[-1])
+    parser = argparse.ArgumentParser(description="Mock streaming LLM server for offline load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=default_port)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--words-per-chunk", type=int, default=3)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="fraction of requests that stall")
+    parser.add_argument("--hang-seconds", type=float, default=120.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    server, url = start_mock_server(
+        args.host, args.port,
+        first_token_delay=args.first_token_delay, token_delay=args.token_delay,
+        words_per_chunk=args.words_per_chunk, error_rate=args.error_rate,
+        hang_rate=args.hang_rate, hang_seconds=args.hang_seconds, seed=args.seed,
+    )
+    print(f"[INFO] Mock LLM listening on {url} (MEDBOT_LLM_BACKEND=http MEDBOT_LLM_URL={url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import re
+import time
+from collections import Counter
+
+from dotenv import load_dotenv
+
+from utils.answer_store import get_answer_store, index_version
+from utils.qa_engine import QAEngine, MAX_CONCURRENT_LLM_CALLS
+from utils.rag_retriever import get_retriever_service
+
+# ---------------------------
+# Precompute answers for frequent questions
+# ---------------------------
+# Generates answers (with their retrieved context) for a question set and
+# stores them against the current index build. At query time QAEngine serves
+# a stored answer when the question retrieved the same chunks and its
+# embedding is close enough, skipping the LLM. Run again after rebuilding the
+# knowledge base: only questions without an answer for the new build are
+# regenerated.
+#
+#   python precompute_answers.py --top-n 300
+#   python precompute_answers.py --questions questions.txt --prune
+
+DEFAULT_TEMPLATES = ("What is {}?", "What are the symptoms of {}?")
+_TITLE_RE = re.compile(r"^Title:\s*(.+)$", re.MULTILINE)
+
+
+def medlineplus_titles(zip_path: str, limit: int = None) -> list:
+    """Health-topic titles from the MedlinePlus dump, in file order, without duplicates."""
+    from build_langchain_kb import MEDLINEPLUS_ZIP_PATH, iter_medlineplus_zip
+
+    titles = {}
+    for doc in iter_medlineplus_zip(zip_path or MEDLINEPLUS_ZIP_PATH):
+        match = _TITLE_RE.search(doc.page_content)
+        if match and match.group(1).strip() != "Unknown Topic":
+            titles.setdefault(match.group(1).strip())
+            if limit and len(titles) >= limit:
+                break
+    return list(titles)
+
+
+def load_questions(path: str) -> list:
+    """One question per line; the most frequent come first, so repeated lines rank higher."""
+    with open(path, "r", encoding="utf-8") as f:
+        counts = Counter(line.strip() for line in f if line.strip())
+    return [q for q, _ in counts.most_common()]
+
+
+async def generate(engine, questions, store, version, clients):
+    service = get_retriever_service()
+    gate = asyncio.Semaphore(clients)
+    done, failed = 0, 0
+
+    async def one(question):
+        nonlocal done, failed
+        async with gate:
+            try:
+                result = await engine.answer(question)
+            except Exception as e:
+                failed += 1
+                print(f"[WARN] Failed: {question} ({e})")
+                return
+        if not result["answer"]:
+            failed += 1
+            print(f"[WARN] Empty answer: {question}")
+            return
+        store.put(question, service.embed_query(question), result["answer"], result["context_items"], version)
+        done += 1
+        if done % 25 == 0:
+            print(f"[INFO] {done}/{len(questions)} answers stored")
+
+    await asyncio.gather(*(one(q) for q in questions))
+    return done, failed
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Pre-generate answers for frequent medical questions.")
+    parser.add_argument("--questions", help="question file, one per line (repeats rank a question higher)")
+    parser.add_argument("--medlineplus-zip", help="MedlinePlus dump used for the default question set")
+    parser.add_argument("--template", action="append",
+                        help=f"question template for each title (default: {' | '.join(DEFAULT_TEMPLATES)})")
+    parser.add_argument("--top-n", type=int, default=300, help="number of questions to precompute")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_LLM_CALLS)
+    parser.add_argument("--force", action="store_true", help="regenerate answers that are already current")
+    parser.add_argument("--prune", action="store_true",
+                        help="delete answers of older builds and questions outside this set")
+    args = parser.parse_args(argv)
+
+    version = index_version()
+    if version is None:
+        print("❌ No knowledge base index found. Run build_langchain_kb.py first.")
+        return 1
+
+    if args.questions:
+        questions = load_questions(args.questions)[:args.top_n]
+    else:
+        templates = args.template or list(DEFAULT_TEMPLATES)
+        titles = medlineplus_titles(args.medlineplus_zip, limit=-(-args.top_n // len(templates)))
+        questions = [t.format(title) for title in titles for t in templates][:args.top_n]
+    if not questions:
+        print("❌ No questions to precompute.")
+        return 1
+
+    store = get_answer_store()
+    current = set() if args.force else store.current_questions(version)
+    todo = [q for q in questions if q not in current]
+    print(f"[INFO] Index build {version}: {len(questions)} questions, "
+          f"{len(questions) - len(todo)} current, {len(todo)} to generate")
+
+    start = time.perf_counter()
+    if todo:
+        engine = QAEngine(use_cache=False, use_answers=False, max_concurrency=args.concurrency)
+        done, failed = asyncio.run(generate(engine, todo, store, version, args.concurrency * 2))
+        print(f"✅ Stored {done} answers ({failed} failed) in {time.perf_counter() - start:.1f}s")
+
+    if index_version() != version:
+        print("[WARN] The index was rebuilt while answers were generated; run this job again.")
+    if args.prune:
+        removed = store.prune(questions, version)
+        print(f"[INFO] Pruned {removed} stale answers")
+    print(f"[INFO] Store: {store.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
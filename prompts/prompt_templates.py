@@ -1,7 +1,8 @@
-def build_rag_prompt(question: str, context: str) -> str:
+def build_rag_prompt(question: str, context: str, mention_doctor: bool = None) -> str:
     """
     Builds the prompt for RAG-based medical Q&A.
-    Automatically adds 'When to see a doctor' guidance if question/context implies it.
+    Automatically adds 'When to see a doctor' guidance if question/context implies it,
+    unless ``mention_doctor`` forces it on or off.
     """
 
     # Simple heuristics
@@ -11,31 +12,27 @@ def build_rag_prompt(question: str, context: str) -> str:
     should_mention_doctor = any(kw in q_lower for kw in [
         "when should", "should i see", "see a doctor", "urgent", "emergency", "consult"
     ]) or "see a doctor" in c_lower or "consult" in c_lower or "emergency" in c_lower
+    if mention_doctor is not None:
+        should_mention_doctor = mention_doctor
 
     # Doctor section toggle
     doctor_section = (
-        "5. If the user's question includes or implies concern about severity "
-        "(e.g., 'should I see a doctor'), or the context provides relevant advice, "
-        "include a final section titled **'When to See a Doctor'** summarizing public guidance.\n"
+        "3. End with a **'When to See a Doctor'** section summarizing the public guidance.\n"
         if should_mention_doctor else
-        "5. Only include a **'When to See a Doctor'** section if the context contains such advice or the user explicitly asks about it.\n"
+        "3. Add a **'When to See a Doctor'** section only if the context gives such advice or the user asks.\n"
     )
 
     return (
-        "You are a helpful and trusted medical assistant trained to support academic learning and public health education. "
-        "This response is for informational purposes only—not for diagnosis, treatment, or medical advice.\n\n"
-        "You will receive a **medical question** and **retrieved knowledge base context** from trusted sources "
-        "(MedlinePlus, Gale Encyclopedia, Kaggle disease datasets).\n\n"
-        "Your task:\n"
-        "1. Read and understand the user's question carefully.\n"
-        "2. Analyze the provided context and use only that content to answer accurately.\n"
-        "3. Be clear, factual, detailed and educational.Use elaboration and supporting facts from context. Avoid speculation.\n"
-        "4. Structure your response using bullet points or short sections when useful.\n"
+        "You are a trusted medical assistant for academic learning and public health education. "
+        "This is informational only, not diagnosis, treatment or medical advice.\n\n"
+        "Answer the question using only the context below (MedlinePlus, Gale Encyclopedia, Kaggle disease data).\n"
+        "1. Be clear, factual and educational; support points with facts from the context, never speculate.\n"
+        "2. Use bullet points or short sections when useful.\n"
         f"{doctor_section}"
-        "6. If the context is insufficient or unclear, say so politely and avoid guessing.\n\n"
+        "4. If the context is insufficient, say so instead of guessing.\n\n"
         f"Context:\n{context}\n\n"
         f"User Question:\n{question}\n\n"
-        "Now write a clear, comprehensive structured, detailed and educational response:\n\nAnswer:"
+        "Answer:"
     )
 
 
@@ -0,0 +1,134 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import requests
+
+from mock_llm_server import start_mock_server
+from utils.llm_backends import HTTPBackend
+from utils.qa_engine import QAEngine, EngineBusy, MAX_CONCURRENT_LLM_CALLS
+from utils.rag_retriever import retrieve_context
+
+# ---------------------------
+# Q&A engine load test
+# ---------------------------
+# Fires many questions at QAEngine against the mock LLM server and reports
+# throughput, latency percentiles, coalescing, retries and the LLM concurrency
+# the server actually saw.
+#
+#   python qa_load_test.py --requests 500 --clients 100 --llm-concurrency 8
+#   python qa_load_test.py --url http://127.0.0.1:8808 --retrieval
+
+QUESTIONS = [
+    "What are the symptoms of {}?",
+    "How is {} treated?",
+    "What causes {}?",
+    "When should I see a doctor about {}?",
+]
+TOPICS = [
+    "diabetes", "asthma", "migraine", "hypertension", "influenza", "malaria", "dengue",
+    "tuberculosis", "pneumonia", "jaundice", "chickenpox", "psoriasis", "arthritis",
+]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def no_retrieval(question):
+    return "", []
+
+
+async def run_load(engine, questions, clients):
+    latencies, errors, busy = [], [], 0
+    gate = asyncio.Semaphore(clients)
+
+    async def client(question):
+        nonlocal busy
+        async with gate:
+            start = time.perf_counter()
+            try:
+                await engine.answer(question)
+                latencies.append(time.perf_counter() - start)
+            except EngineBusy:
+                busy += 1
+            except Exception as e:
+                errors.append(repr(e))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(q) for q in questions))
+    return latencies, errors, busy, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the async Q&A engine.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=50, help="concurrent callers")
+    parser.add_argument("--unique", type=int, default=40, help="distinct questions (repeats get coalesced)")
+    parser.add_argument("--llm-concurrency", type=int, default=MAX_CONCURRENT_LLM_CALLS)
+    parser.add_argument("--max-pending", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--retries", type=int, default=2)
+    parser.add_argument("--url", help="use a running LLM server instead of starting the mock")
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.05)
+    parser.add_argument("--retrieval", action="store_true", help="run real FAISS retrieval (needs a built index)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    url = args.url
+    if url is None:
+        _, url = start_mock_server(first_token_delay=args.first_token_delay, token_delay=args.token_delay,
+                                   error_rate=args.error_rate, seed=args.seed)
+
+    rng = random.Random(args.seed)
+    pool = [rng.choice(QUESTIONS).format(rng.choice(TOPICS)) + f" (case {i})" for i in range(args.unique)]
+    questions = [rng.choice(pool) for _ in range(args.requests)]
+
+    engine = QAEngine(
+        backend=HTTPBackend(url),
+        retrieve=retrieve_context if args.retrieval else no_retrieval,
+        use_cache=False,
+        use_answers=False,
+        max_concurrency=args.llm_concurrency,
+        max_pending=args.max_pending,
+        timeout=args.timeout,
+        retries=args.retries,
+    )
+
+    latencies, errors, busy, wall = asyncio.run(run_load(engine, questions, args.clients))
+    server = requests.get(f"{url}/stats", timeout=5).json()
+    report = {
+        "requests": args.requests,
+        "completed": len(latencies),
+        "failed": len(errors),
+        "rejected_busy": busy,
+        "wall_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "engine": engine.counters,
+        "llm_server": server,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"✅ {report['completed']}/{args.requests} answered in {report['wall_s']}s "
+          f"({report['throughput_rps']} req/s), {report['failed']} failed, {busy} rejected")
+    print(f"⏱ p50 {report['p50_ms']} ms · p95 {report['p95_ms']} ms · p99 {report['p99_ms']} ms")
+    print(f"🔁 Engine: {engine.counters}")
+    print(f"🖥 LLM server: {server} (limit {args.llm_concurrency})")
+    for error in sorted(set(errors))[:5]:
+        print(f"[WARN] {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.workloads import symptom_workload
+from utils.symptom_checker import SymptomChecker, SYMPTOM_MODES
+
+# ---------------------------
+# Symptom checker concurrency stress test
+# ---------------------------
+# Scores a fixed symptom workload once serially, then again from many threads
+# sharing one SymptomChecker (single predictions and batches interleaved), and
+# fails if any parallel result differs from the serial run.
+#
+#   python symptom_stress_test.py
+#   python symptom_stress_test.py --threads 64 --cases 2000 --rounds 5 --modes heuristic,model
+
+
+def frame_result(df) -> list:
+    """Comparable form of a ``predict`` frame: (row label, disease, score, matched tokens) per row."""
+    return [(int(idx), row["Disease"], float(row["score"]), tuple(sorted(row["symptom_tokens"])))
+            for idx, row in df.iterrows()]
+
+
+def serial_results(checker, cases, top_n, batch_size, mode):
+    single = [frame_result(checker.predict(case, top_n, mode=mode)) for case in cases]
+    batches = [list(checker.predict_batch(cases[i:i + batch_size], top_n, mode=mode))
+               for i in range(0, len(cases), batch_size)]
+    return single, batches
+
+
+def run_parallel(checker, cases, top_n, batch_size, mode, threads, rounds, expected):
+    single_expected, batch_expected = expected
+    mismatches = []
+    lock = threading.Lock()
+    start_gate = threading.Barrier(threads)
+
+    def worker(worker_id):
+        start_gate.wait()  # start together so calls actually overlap
+        for r in range(rounds):
+            # Each worker walks the workload from its own offset, mixing both entry points
+            for step in range(len(cases)):
+                i = (worker_id * 7919 + r * 31 + step) % len(cases)
+                if step % 10 == 0:
+                    b = i // batch_size
+                    got = list(checker.predict_batch(cases[b * batch_size:(b + 1) * batch_size], top_n, mode=mode))
+                    if got != batch_expected[b]:
+                        with lock:
+                            mismatches.append(("predict_batch", mode, b))
+                else:
+                    got = frame_result(checker.predict(cases[i], top_n, mode=mode))
+                    if got != single_expected[i]:
+                        with lock:
+                            mismatches.append(("predict", mode, i))
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(worker, range(threads)))
+    return mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check SymptomChecker results under parallel load.")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--cases", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=2, help="passes over the workload per thread")
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--modes", default="heuristic", help=f"comma-separated: {', '.join(SYMPTOM_MODES)}")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    cases = symptom_workload(args.cases, seed=args.seed)
+    checker = SymptomChecker()
+    failed = False
+    for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+        expected = serial_results(checker, cases, args.top_n, args.batch_size, mode)
+        start = time.perf_counter()
+        mismatches = run_parallel(checker, cases, args.top_n, args.batch_size, mode,
+                                  args.threads, args.rounds, expected)
+        calls = args.threads * args.rounds * len(cases)
+        elapsed = time.perf_counter() - start
+        if mismatches:
+            failed = True
+            print(f"❌ {mode}: {len(mismatches)} of {calls} parallel calls differ from the serial run, "
+                  f"first: {mismatches[:5]}")
+        else:
+            print(f"✅ {mode}: {calls} calls on {args.threads} threads matched the serial run ({elapsed:.1f}s)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import argparse
+import time
+
+from utils.symptom_artifact import SYMPTOM_CSV
+from utils.symptom_checker import SymptomChecker
+from utils.symptom_model import DEFAULT_MODEL_KIND, MODEL_DIR, MODEL_KINDS, load_symptom_model
+
+# ---------------------------
+# Train the symptom classifier
+# ---------------------------
+# Build step for MEDBOT_SYMPTOM_MODE=model: trains the classifier on
+# disease_symptom.csv and saves it under data/.cache/symptom_model/, so the app
+# and API only load it. Models that are already current are kept unless --force.
+#
+#   python train_symptom_model.py
+#   python train_symptom_model.py --kind all --force
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train and save the symptom classifier.")
+    parser.add_argument("--csv", default=SYMPTOM_CSV)
+    parser.add_argument("--kind", choices=[*MODEL_KINDS, "all"], default=DEFAULT_MODEL_KIND)
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--force", action="store_true", help="retrain even if the saved model is current")
+    args = parser.parse_args(argv)
+
+    checker = SymptomChecker(args.csv, model_dir=args.model_dir)
+    for kind in MODEL_KINDS if args.kind == "all" else [args.kind]:
+        start = time.perf_counter()
+        model = load_symptom_model(checker, kind, args.model_dir, retrain=args.force)
+        print(f"✅ {kind}: {len(model.diseases)} diseases x {len(model.symptoms)} symptoms "
+              f"({time.perf_counter() - start:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,202 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from utils.telemetry import estimate_tokens, incr, span
+
+
+# -------------------
+# Config
+# -------------------
+MEMORY_STRATEGY = os.getenv("MEDBOT_AGENT_MEMORY", "window")  # "window" or "summary"
+MAX_HISTORY_TOKENS = int(os.getenv("MEDBOT_AGENT_HISTORY_TOKENS", "1000"))
+MAX_SUMMARY_TOKENS = 300
+MAX_SESSIONS = int(os.getenv("MEDBOT_AGENT_MAX_SESSIONS", "256"))
+SESSION_IDLE_SECONDS = float(os.getenv("MEDBOT_AGENT_IDLE_SECONDS", "1800"))
+DEFAULT_SESSION = "default"
+
+SUMMARY_PROMPT = """Condense this conversation between a user and a medical assistant into a short summary.
+Keep the symptoms, conditions and advice mentioned; drop greetings and repetition.
+
+Current summary:
+{summary}
+
+New lines:
+{lines}
+
+Updated summary:"""
+
+
+# -------------------
+# Per-session memory
+# -------------------
+class SessionMemory:
+    """
+    Conversation history of one session, kept under ``max_tokens``.
+
+    With the ``window`` strategy the oldest turns are dropped once the budget
+    is exceeded. With ``summary`` they are folded into a running summary by
+    the LLM (capped at ``MAX_SUMMARY_TOKENS``); if that call fails the turns
+    are dropped as with ``window``.
+    """
+
+    def __init__(self, strategy: str = MEMORY_STRATEGY, max_tokens: int = MAX_HISTORY_TOKENS, llm=None):
+        if strategy not in ("window", "summary"):
+            raise ValueError(f"Unknown memory strategy '{strategy}'. Use 'window' or 'summary'.")
+        self.strategy = strategy
+        self.max_tokens = max_tokens
+        self.llm = llm
+        self.summary = ""
+        self.turns = []  # (user text, assistant text), oldest first
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def messages(self) -> list:
+        history = [SystemMessage(content=f"Summary of the earlier conversation: {self.summary}")] if self.summary else []
+        for user_text, ai_text in self.turns:
+            history += [HumanMessage(content=user_text), AIMessage(content=ai_text)]
+        return history
+
+    def tokens(self) -> int:
+        return estimate_tokens(self.summary) + sum(estimate_tokens(u) + estimate_tokens(a) for u, a in self.turns)
+
+    def add_turn(self, user_text: str, ai_text: str):
+        self.turns.append((user_text, ai_text))
+        self._trim()
+
+    def _trim(self):
+        overflow = []
+        # The newest turn is always kept, even if it alone exceeds the budget
+        while len(self.turns) > 1 and self.tokens() > self.max_tokens:
+            overflow.append(self.turns.pop(0))
+        if not overflow:
+            return
+        incr("agent_history_trimmed_total", len(overflow), strategy=self.strategy)
+        if self.strategy == "summary" and self.llm is not None:
+            self.summary = self._summarize(overflow)
+
+    def _summarize(self, turns: list) -> str:
+        lines = "\n".join(f"User: {u}\nAssistant: {a}" for u, a in turns)
+        try:
+            with span("agent.summarize"):
+                response = self.llm.invoke(SUMMARY_PROMPT.format(summary=self.summary or "(none)", lines=lines))
+            summary = getattr(response, "content", response).strip()
+        except Exception as e:
+            print(f"[WARN] Summarizing agent history failed, dropping old turns: {e}")
+            return self.summary
+        # Keep the summary itself bounded
+        return summary[:MAX_SUMMARY_TOKENS * 4]
+
+
+# -------------------
+# Agent pool
+# -------------------
+class AgentPool:
+    """
+    One shared LLM and agent executor, with per-session bounded memory.
+
+    Sessions are kept in LRU order: a session idle for ``idle_seconds`` is
+    dropped on the next access to the pool, and when more than
+    ``max_sessions`` are open the least recently used one is evicted. Prompt
+    size per turn is bounded by the history budget and RAM by the session cap.
+    """
+
+    def __init__(self, llm=None, agent=None, strategy: str = MEMORY_STRATEGY,
+                 max_history_tokens: int = MAX_HISTORY_TOKENS, max_sessions: int = MAX_SESSIONS,
+                 idle_seconds: float = SESSION_IDLE_SECONDS, verbose: bool = False):
+        self._llm = llm
+        self._agent = agent
+        self.strategy = strategy
+        self.max_history_tokens = max_history_tokens
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.verbose = verbose
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            from utils.symptom_agent import get_llm
+
+            self._llm = get_llm()
+        return self._llm
+
+    @property
+    def agent(self):
+        if self._agent is None:
+            with self._lock:
+                if self._agent is None:
+                    from utils.symptom_agent import build_agent
+
+                    self._agent = build_agent(llm=self.llm, verbose=self.verbose)
+        return self._agent
+
+    def session(self, session_id: str = DEFAULT_SESSION) -> SessionMemory:
+        # The summarizer shares the agent's LLM
+        summarizer = self.llm if self.strategy == "summary" else None
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            memory = self._sessions.get(session_id)
+            if memory is None:
+                memory = SessionMemory(self.strategy, self.max_history_tokens, llm=summarizer)
+                self._sessions[session_id] = memory
+                if len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+                    incr("agent_sessions_evicted_total", reason="capacity")
+            self._sessions.move_to_end(session_id)
+            memory.last_used = now
+            return memory
+
+    def _evict(self, now: float):
+        # Oldest first, so stop at the first session that is still active
+        while self._sessions:
+            session_id, memory = next(iter(self._sessions.items()))
+            if now - memory.last_used < self.idle_seconds:
+                break
+            del self._sessions[session_id]
+            incr("agent_sessions_evicted_total", reason="idle")
+
+    def run(self, user_input: str, session_id: str = DEFAULT_SESSION) -> str:
+        memory = self.session(session_id)
+        # One turn at a time per session; different sessions run in parallel
+        with memory.lock:
+            with span("agent.run"):
+                result = self.agent.invoke({"input": user_input, "chat_history": memory.messages()})
+            answer = result["output"] if isinstance(result, dict) else str(result)
+            memory.add_turn(user_input, answer)
+        return answer
+
+    def record_turn(self, user_input: str, answer: str, session_id: str = DEFAULT_SESSION):
+        """Adds a turn answered outside the agent (e.g. the symptom fast path) to the session history."""
+        memory = self.session(session_id)
+        with memory.lock:
+            memory.add_turn(user_input, answer)
+
+    def reset(self, session_id: str = DEFAULT_SESSION):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "history_tokens": sum(m.tokens() for m in self._sessions.values()),
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_agent_pool() -> AgentPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = AgentPool()
+    return _pool
@@ -0,0 +1,214 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from utils.file_utils import current_build_dir
+from utils.response_cache import context_key
+from utils.telemetry import incr
+
+
+# -------------------
+# Paths & Config
+# -------------------
+ANSWER_STORE_PATH = os.path.join("data", "answer_store.sqlite")
+MANIFEST_FILE = "manifest.json"  # written by build_langchain_kb.py
+MATCH_THRESHOLD = float(os.getenv("MEDBOT_ANSWER_MATCH_THRESHOLD", "0.96"))
+VERSION_CHECK_SECONDS = 30.0
+
+
+def index_version(index_dir: str = None):
+    """
+    Identity of the published index build: the name of its build directory,
+    which is unique per build. Indexes published before builds were versioned
+    fall back to the manifest's ``built_at`` and embedding model, or the index
+    file's mtime. None if there is no index.
+    """
+    if index_dir is None:
+        from utils.rag_retriever import INDEX_DIR
+
+        index_dir = INDEX_DIR
+    build_dir = current_build_dir(index_dir)
+    if build_dir is not None:
+        return os.path.basename(build_dir)
+    manifest_path = os.path.join(index_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        return f"{manifest['built_at']}|{manifest.get('embed_model', '')}"
+    except (OSError, ValueError, KeyError):
+        pass
+    index_path = os.path.join(index_dir, "index.faiss")
+    if os.path.exists(index_path):
+        return f"mtime:{os.stat(index_path).st_mtime_ns}"
+    return None
+
+
+# -------------------
+# Precomputed answer store
+# -------------------
+class AnswerStore:
+    """
+    SQLite store of answers pre-generated by ``precompute_answers.py``.
+
+    Every answer records the index build it was generated against. Only
+    entries of the current build are served: their unit question embeddings
+    are held in one matrix, so a lookup is a single matrix-vector product.
+    Like the response cache's semantic fallback, a stored answer is only taken
+    for a question that retrieved the same chunks, so near-identical wordings
+    about different conditions ("hepatitis A" / "hepatitis B") never share one.
+    The current build and the table contents are re-checked every
+    ``check_interval`` seconds, so a rebuilt index or a finished batch job is
+    picked up without a restart.
+    """
+
+    def __init__(self, path: str = ANSWER_STORE_PATH, index_dir: str = None,
+                 threshold: float = MATCH_THRESHOLD, check_interval: float = VERSION_CHECK_SECONDS):
+        self.path = path
+        self.index_dir = index_dir
+        self.threshold = threshold
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS answers ("
+            " question TEXT PRIMARY KEY,"
+            " embedding BLOB NOT NULL,"
+            " answer TEXT NOT NULL,"
+            " context_items TEXT NOT NULL,"
+            " index_version TEXT NOT NULL,"
+            " created REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._resident = None  # (index version, table stamp, questions, context keys, embedding matrix)
+        self._last_check = 0.0
+
+    def current_version(self):
+        return index_version(self.index_dir)
+
+    def _table_stamp(self):
+        return self._conn.execute("SELECT COUNT(*), MAX(created) FROM answers").fetchone()
+
+    def _snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            if self._resident is not None and now - self._last_check < self.check_interval:
+                return self._resident
+            self._last_check = now
+            version, stamp = self.current_version(), self._table_stamp()
+            if self._resident is None or self._resident[:2] != (version, stamp):
+                rows = self._conn.execute(
+                    "SELECT question, embedding, context_items FROM answers WHERE index_version = ?", (version,)
+                ).fetchall() if version else []
+                matrix = (np.stack([np.frombuffer(r[1], dtype=np.float32) for r in rows])
+                          if rows else np.empty((0, 0), dtype=np.float32))
+                keys = np.array([context_key(json.loads(r[2])) for r in rows], dtype=object)
+                self._resident = (version, stamp, [r[0] for r in rows], keys, matrix)
+            return self._resident
+
+    def lookup(self, question_embedding, ctx_key: str):
+        """
+        The closest stored answer whose context key is ``ctx_key``, as a dict
+        with question, answer, context_items and similarity, or None below the
+        threshold.
+        """
+        version, _, questions, keys, matrix = self._snapshot()
+        row = None
+        candidates = np.flatnonzero(keys == ctx_key) if questions else []
+        if len(candidates):
+            sims = matrix[candidates] @ _unit(np.asarray(question_embedding, dtype=np.float32))
+            best = int(np.argmax(sims))
+            similarity, question = float(sims[best]), questions[candidates[best]]
+            if similarity >= self.threshold:
+                with self._lock:
+                    row = self._conn.execute(
+                        "SELECT answer, context_items FROM answers WHERE question = ? AND index_version = ?",
+                        (question, version),
+                    ).fetchone()  # None if replaced since the snapshot was taken
+        with self._lock:
+            if row is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        incr("answer_store_lookups_total", result="miss" if row is None else "hit")
+        if row is None:
+            return None
+        return {
+            "question": question,
+            "answer": row[0],
+            "context_items": [tuple(item) for item in json.loads(row[1])],
+            "similarity": similarity,
+        }
+
+    def put(self, question: str, question_embedding, answer: str, context_items, version: str):
+        embedding = _unit(np.asarray(question_embedding, dtype=np.float32)).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers"
+                " (question, embedding, answer, context_items, index_version, created)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (question, embedding, answer, json.dumps([list(i) for i in context_items]), version, time.time()),
+            )
+            self._conn.commit()
+            self._last_check = 0.0
+
+    def current_questions(self, version: str) -> set:
+        """Questions that already have an answer for the given index build."""
+        with self._lock:
+            rows = self._conn.execute("SELECT question FROM answers WHERE index_version = ?", (version,))
+            return {r[0] for r in rows}
+
+    def prune(self, keep_questions=None, version: str = None) -> int:
+        """Deletes entries of other index builds and, if given, questions outside ``keep_questions``."""
+        with self._lock:
+            removed = 0
+            if version is not None:
+                removed += self._conn.execute("DELETE FROM answers WHERE index_version != ?", (version,)).rowcount
+            if keep_questions is not None:
+                keep = set(keep_questions)
+                stale = [r[0] for r in self._conn.execute("SELECT question FROM answers") if r[0] not in keep]
+                self._conn.executemany("DELETE FROM answers WHERE question = ?", [(q,) for q in stale])
+                removed += len(stale)
+            self._conn.commit()
+            self._last_check = 0.0
+            return removed
+
+    def stats(self) -> dict:
+        version, _, questions, _, _ = self._snapshot()
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            hits, misses = self.hits, self.misses
+        return {
+            "index_version": version,
+            "current": len(questions),
+            "stale": total - len(questions),
+            "hits": hits,
+            "misses": misses,
+        }
+
+
+def _unit(vec: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_answer_store() -> AnswerStore:
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AnswerStore()
+    return _store
@@ -0,0 +1,111 @@
+import json
+import os
+from typing import Optional
+
+
+# -------------------
+# Config
+# -------------------
+API_TIMEOUT_SECONDS = 120.0
+
+
+def get_api_url() -> Optional[str]:
+    """Base URL of the MedBot API (``MEDBOT_API_URL``); None means compute runs in-process."""
+    url = os.getenv("MEDBOT_API_URL")
+    return url.rstrip("/") if url else None
+
+
+class APIBusy(RuntimeError):
+    """The API rejected a question because too many are pending."""
+
+
+# -------------------
+# Thin client
+# -------------------
+class MedBotClient:
+    """Client for ``api_server.py``, used by the Streamlit UI when MEDBOT_API_URL is set."""
+
+    def __init__(self, base_url: str, timeout: float = API_TIMEOUT_SECONDS):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def _post(self, path: str, payload: dict, **kwargs):
+        response = self.session.post(f"{self.base_url}{path}", json=payload, timeout=self.timeout, **kwargs)
+        if response.status_code == 503:
+            raise APIBusy(response.json().get("detail", "API busy"))
+        response.raise_for_status()
+        return response
+
+    def health(self) -> dict:
+        response = self.session.get(f"{self.base_url}/health", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def diagnose(self, symptoms, top_n: int = 3, min_score: float = 0.0, mode: str = None) -> dict:
+        payload = {"symptoms": symptoms, "top_n": top_n, "min_score": min_score, "mode": mode}
+        return self._post("/diagnose", payload).json()
+
+    def diagnose_batch(self, cases, top_n: int = 3, min_score: float = 0.0, mode: str = None) -> list:
+        payload = {"cases": list(cases), "top_n": top_n, "min_score": min_score, "mode": mode}
+        return self._post("/diagnose/batch", payload).json()["results"]
+
+    def retrieve(self, query: str, top_k: int = 3, max_context_tokens: int = None):
+        """
+        Same return shape as ``retrieve_context``: (context_str, [(source, chunk), ...]).
+        Without ``max_context_tokens`` the server's context budget applies.
+        """
+        payload = {"query": query, "top_k": top_k}
+        if max_context_tokens is not None:
+            payload["max_context_tokens"] = max_context_tokens
+        data = self._post("/retrieve", payload).json()
+        return data["context"], [(item["source"], item["chunk"]) for item in data["context_items"]]
+
+    def ask(self, question: str) -> dict:
+        return self._post("/ask", {"question": question}).json()
+
+    def stream(self, question: str) -> "APIStream":
+        return APIStream(self, question)
+
+
+class APIStream:
+    """
+    Iterates answer pieces streamed by ``/ask``. After the iteration ends,
+    ``result`` holds the final payload with ``context_items`` as (source, chunk)
+    tuples, matching ``QAStream`` so the UI can use either.
+    """
+
+    def __init__(self, client: MedBotClient, question: str):
+        self.client = client
+        self.question = question
+        self.result = None
+
+    def __iter__(self):
+        response = self.client._post("/ask", {"question": self.question, "stream": True}, stream=True)
+        with response:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                message = json.loads(line)
+                if "text" in message:
+                    yield message["text"]
+                elif "error" in message:
+                    raise (APIBusy if message.get("busy") else RuntimeError)(message["error"])
+                elif message.get("done"):
+                    message["context_items"] = [(i["source"], i["chunk"]) for i in message["context_items"]]
+                    self.result = message
+
+
+_client = None
+
+
+def get_api_client() -> Optional[MedBotClient]:
+    global _client
+    url = get_api_url()
+    if url is None:
+        return None
+    if _client is None or _client.base_url != url:
+        _client = MedBotClient(url)
+    return _client
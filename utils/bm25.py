@@ -0,0 +1,120 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+
+# -------------------
+# Paths & Config
+# -------------------
+BM25_FILE = "bm25.npz"
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from has have how i if in into is it its of on or "
+    "should so that the their them there these they this to was what when where which who why "
+    "will with you your".split()
+)
+
+
+def tokenize(text: str) -> list:
+    return [tok for tok in _TOKEN_RE.findall(text.lower()) if tok not in STOPWORDS]
+
+
+# -------------------
+# Inverted-index BM25
+# -------------------
+class BM25Index:
+    """
+    Okapi BM25 over an inverted index stored as flat NumPy arrays.
+
+    Document ids are FAISS row positions, so dense and sparse hits refer to the
+    same chunks. Postings of term ``t`` are ``doc_ids[offsets[t]:offsets[t + 1]]``
+    with matching term frequencies in ``tfs``.
+    """
+
+    def __init__(self, vocab: dict, offsets, doc_ids, tfs, doc_len, k1: float = BM25_K1, b: float = BM25_B):
+        self.vocab = vocab
+        self.offsets = offsets
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.doc_len = doc_len
+        self.k1 = k1
+        self.b = b
+        n_docs = len(doc_len)
+        df = np.diff(offsets)
+        self.idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+        avgdl = float(doc_len.mean()) if n_docs else 0.0
+        # Per-document length normalisation, precomputed once
+        self._norm = k1 * (1.0 - b + b * doc_len / avgdl) if avgdl else np.full(n_docs, k1)
+
+    @classmethod
+    def build(cls, texts, k1: float = BM25_K1, b: float = BM25_B) -> "BM25Index":
+        postings = {}
+        doc_len = []
+        for doc_id, text in enumerate(texts):
+            counts = Counter(tokenize(text))
+            doc_len.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(postings[t]) for t in terms])
+        doc_ids = np.empty(offsets[-1], dtype=np.int32)
+        tfs = np.empty(offsets[-1], dtype=np.float32)
+        for i, term in enumerate(terms):
+            entries = postings[term]
+            doc_ids[offsets[i]:offsets[i + 1]] = [d for d, _ in entries]
+            tfs[offsets[i]:offsets[i + 1]] = [tf for _, tf in entries]
+        vocab = {term: i for i, term in enumerate(terms)}
+        return cls(vocab, offsets, doc_ids, tfs, np.asarray(doc_len, dtype=np.float32), k1, b)
+
+    def save(self, path: str):
+        np.savez(
+            path,
+            terms=np.array(sorted(self.vocab, key=self.vocab.get)),
+            offsets=self.offsets,
+            doc_ids=self.doc_ids,
+            tfs=self.tfs,
+            doc_len=self.doc_len,
+            params=np.array([self.k1, self.b]),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with np.load(path) as data:
+            vocab = {term: i for i, term in enumerate(data["terms"].tolist())}
+            k1, b = data["params"].tolist()
+            return cls(vocab, data["offsets"], data["doc_ids"], data["tfs"], data["doc_len"], k1, b)
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def search(self, query: str, k: int = 10):
+        """Returns ``[(doc_id, score), ...]`` for the top ``k`` documents, best first."""
+        term_ids = {self.vocab[t] for t in tokenize(query) if t in self.vocab}
+        if not term_ids or not len(self):
+            return []
+        scores = np.zeros(len(self), dtype=np.float32)
+        for t in term_ids:
+            start, end = self.offsets[t], self.offsets[t + 1]
+            docs, tf = self.doc_ids[start:end], self.tfs[start:end]
+            scores[docs] += self.idf[t] * tf * (self.k1 + 1) / (tf + self._norm[docs])
+
+        hits = np.flatnonzero(scores)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(int(d), float(scores[d])) for d in hits]
+
+
+def reciprocal_rank_fusion(rankings, k: int = 60) -> list:
+    """Fuses ranked id lists with RRF. Returns ids ordered by fused score."""
+    scores = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda d: (-scores[d], d))
@@ -0,0 +1,112 @@
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Mapping
+
+from langchain_community.docstore.base import Docstore
+from langchain.docstore.document import Document
+
+
+# -------------------
+# Paths & Config
+# -------------------
+CHUNK_STORE_FILE = "chunks.sqlite"
+
+
+# -------------------
+# Build side
+# -------------------
+def write_chunk_store(path: str, index_to_docstore_id: dict, docstore):
+    """
+    Writes chunk texts keyed by their FAISS row position, so the retriever can
+    fetch hits with an indexed lookup instead of unpickling the whole docstore.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE chunks ("
+        " position INTEGER PRIMARY KEY,"
+        " chunk_id TEXT NOT NULL UNIQUE,"
+        " page_content TEXT NOT NULL,"
+        " metadata TEXT NOT NULL)"
+    )
+    rows = []
+    for position, cid in sorted(index_to_docstore_id.items()):
+        doc = docstore.search(cid)
+        rows.append((position, cid, doc.page_content, json.dumps(doc.metadata, default=str)))
+    conn.executemany("INSERT INTO chunks VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+# -------------------
+# Read side
+# -------------------
+class SQLiteChunkStore:
+    """Read-only access to ``chunks.sqlite`` with one connection per thread."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._uri = f"file:{os.path.abspath(path)}?mode=ro"
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def id_at(self, position: int):
+        row = self._conn().execute("SELECT chunk_id FROM chunks WHERE position = ?", (int(position),)).fetchone()
+        return row[0] if row else None
+
+    def count(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def get(self, chunk_id: str):
+        row = self._conn().execute(
+            "SELECT page_content, metadata FROM chunks WHERE chunk_id = ?", (chunk_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return Document(page_content=row[0], metadata=json.loads(row[1]))
+
+
+class SQLiteDocstore(Docstore):
+    """LangChain docstore view over a SQLiteChunkStore. Read-only."""
+
+    def __init__(self, store: SQLiteChunkStore):
+        self.store = store
+
+    def search(self, search: str):
+        doc = self.store.get(search)
+        return doc if doc is not None else f"ID {search} not found."
+
+    def add(self, texts):
+        raise NotImplementedError("SQLiteDocstore is read-only; rebuild the index instead.")
+
+    def delete(self, ids):
+        raise NotImplementedError("SQLiteDocstore is read-only; rebuild the index instead.")
+
+
+class PositionIdMap(Mapping):
+    """``index_to_docstore_id`` replacement that resolves FAISS row positions lazily."""
+
+    def __init__(self, store: SQLiteChunkStore):
+        self.store = store
+        self._len = store.count()
+
+    def __getitem__(self, position):
+        cid = self.store.id_at(position)
+        if cid is None:
+            raise KeyError(position)
+        return cid
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        return iter(range(self._len))
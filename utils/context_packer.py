@@ -0,0 +1,189 @@
+import math
+import os
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+
+from utils.bm25 import tokenize
+from utils.telemetry import incr, span
+
+
+# -------------------
+# Config
+# -------------------
+CONTEXT_TOKEN_BUDGET = int(os.getenv("MEDBOT_CONTEXT_TOKENS", "400"))
+# Whole prompt (instructions + question + context); 0 disables the cap
+PROMPT_TOKEN_BUDGET = int(os.getenv("MEDBOT_PROMPT_TOKENS", "800"))
+TOKENIZER_MODEL = os.getenv("MEDBOT_TOKENIZER", "sentence-transformers/all-MiniLM-L6-v2")
+DUPLICATE_THRESHOLD = 0.9   # term-vector cosine above which a chunk repeats an earlier one
+RANK_WEIGHT = 0.5           # score bonus of the top-ranked chunk's sentences, decaying with rank
+CHUNK_SEPARATOR = "\n\n---\n\n"
+GAP_MARKER = " ... "
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[\"'(\[]?[A-Z0-9])|\n\s*\n|\n(?=\s*[-•*]\s)")
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+
+
+# -------------------
+# Token counting
+# -------------------
+_tokenizer = None
+_tokenizer_lock = threading.Lock()
+
+
+def _get_tokenizer():
+    """Local HF tokenizer, or False when it cannot be loaded (regex estimate is used then)."""
+    global _tokenizer
+    if _tokenizer is None:
+        with _tokenizer_lock:
+            if _tokenizer is None:
+                try:
+                    from transformers import AutoTokenizer
+
+                    tokenizer = AutoTokenizer.from_pretrained(TOKENIZER_MODEL)
+                    tokenizer.model_max_length = 1 << 30  # only counting; silences the length warning
+                    _tokenizer = tokenizer
+                except Exception as e:
+                    print(f"[WARN] Tokenizer '{TOKENIZER_MODEL}' unavailable, estimating tokens: {e}")
+                    _tokenizer = False
+    return _tokenizer
+
+
+@lru_cache(maxsize=16384)
+def count_tokens(text: str) -> int:
+    tokenizer = _get_tokenizer()
+    if tokenizer:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    # Words and punctuation marks; close to a subword count for plain English
+    return len(_PIECE_RE.findall(text))
+
+
+def split_sentences(text: str) -> list:
+    return [s.strip() for s in _SENTENCE_RE.split(text) if s and s.strip()]
+
+
+def prompt_overhead(question: str) -> int:
+    """
+    Tokens of the RAG prompt without any context: instructions plus the
+    question. The doctor guidance depends on the context, so the longer of its
+    two variants is counted.
+    """
+    from prompts.prompt_templates import build_rag_prompt
+
+    return max(count_tokens(build_rag_prompt(question, "", mention_doctor=flag)) for flag in (True, False))
+
+
+def context_budget(question: str, max_context_tokens: int = CONTEXT_TOKEN_BUDGET,
+                   prompt_token_budget: int = PROMPT_TOKEN_BUDGET) -> int:
+    """Context tokens that fit next to the prompt preamble (never more than ``max_context_tokens``)."""
+    if not prompt_token_budget:
+        return max_context_tokens
+    return max(0, min(max_context_tokens, prompt_token_budget - prompt_overhead(question)))
+
+
+# -------------------
+# Near-duplicate removal
+# -------------------
+def _cosine(a: Counter, b: Counter) -> float:
+    if not a or not b:
+        return 0.0
+    dot = sum(count * b.get(term, 0) for term, count in a.items())
+    return dot / (math.sqrt(sum(c * c for c in a.values())) * math.sqrt(sum(c * c for c in b.values())))
+
+
+def drop_near_duplicates(docs: list, threshold: float = DUPLICATE_THRESHOLD) -> list:
+    """Keeps docs in rank order, skipping any whose term vector is near one already kept."""
+    kept, vectors = [], []
+    for doc in docs:
+        vector = Counter(tokenize(doc.page_content))
+        if any(_cosine(vector, seen) >= threshold for seen in vectors):
+            continue
+        kept.append(doc)
+        vectors.append(vector)
+    return kept
+
+
+# -------------------
+# Packing
+# -------------------
+def source_label(metadata: dict) -> str:
+    """Citation for a chunk: its source, plus the page for PDF chunks ("MedicalEncyclopedia (p. 12)")."""
+    source = metadata.get("source", "Unknown")
+    page = metadata.get("page")
+    return f"{source} (p. {int(page) + 1})" if page is not None else source
+
+
+def _truncate_words(sentence: str, budget: int) -> str:
+    words = sentence.split()
+    lo, hi = 0, len(words)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count_tokens(" ".join(words[:mid])) <= budget:
+            lo = mid
+        else:
+            hi = mid - 1
+    if not lo:
+        return ""
+    return " ".join(words[:lo]) + ("..." if lo < len(words) else "")
+
+
+def pack_context(query: str, docs: list, budget: int = CONTEXT_TOKEN_BUDGET,
+                 duplicate_threshold: float = DUPLICATE_THRESHOLD):
+    """
+    Fills ``budget`` tokens with whole sentences from the ranked ``docs``.
+
+    Near-duplicate chunks are dropped first, and a sentence repeated by
+    overlapping chunks is only taken once. Every remaining sentence is
+    scored by the share of query terms it contains plus a bonus that decays
+    with its chunk's rank; sentences are taken best first while they fit.
+    Kept sentences are re-assembled in document order per chunk, with chunks
+    in rank order. Returns (context string, [(source, text)]) like
+    ``retrieve_context``.
+    """
+    with span("context.pack"):
+        unique = drop_near_duplicates(docs, duplicate_threshold)
+        if len(unique) < len(docs):
+            incr("context_duplicates_dropped_total", len(docs) - len(unique))
+
+        query_terms = set(tokenize(query))
+        sentences = []  # (score, doc position, sentence position, text, tokens)
+        for d, doc in enumerate(unique):
+            for s, sentence in enumerate(split_sentences(doc.page_content)):
+                overlap = len(query_terms & set(tokenize(sentence))) / len(query_terms) if query_terms else 0.0
+                sentences.append((overlap + RANK_WEIGHT / (1 + d), d, s, sentence, count_tokens(sentence)))
+
+        separator_tokens = count_tokens(CHUNK_SEPARATOR.strip()) + 1
+        chosen, used, seen = {}, 0, set()
+        for _, d, s, sentence, tokens in sorted(sentences, key=lambda x: (-x[0], x[1], x[2])):
+            # Overlapping chunks repeat sentences verbatim; take each one once
+            key = " ".join(sentence.lower().split())
+            if key in seen:
+                continue
+            # A joining space inside a chunk; a separator before every chunk but the first
+            cost = tokens + (1 if d in chosen else separator_tokens if chosen else 0)
+            if used + cost <= budget:
+                chosen.setdefault(d, []).append((s, sentence))
+                seen.add(key)
+                used += cost
+
+        if not chosen and sentences:
+            # Even the best sentence is over budget (e.g. PDF text without punctuation)
+            _, d, s, sentence, _ = min(sentences, key=lambda x: (-x[0], x[1], x[2]))
+            text = _truncate_words(sentence, budget)
+            if text:
+                chosen[d] = [(s, text)]
+                used = count_tokens(text)
+
+        context_items = []
+        for d in sorted(chosen):
+            parts, previous = [], None
+            for s, sentence in sorted(chosen[d]):
+                if previous is not None:
+                    parts.append(" " if s == previous + 1 else GAP_MARKER)
+                parts.append(sentence)
+                previous = s
+            context_items.append((source_label(unique[d].metadata), "".join(parts)))
+
+        incr("context_tokens_total", used)
+        return CHUNK_SEPARATOR.join(text for _, text in context_items), context_items
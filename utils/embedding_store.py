@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+import numpy as np
+
+
+# -------------------
+# Paths & Config
+# -------------------
+EMBEDDING_STORE_PATH = os.path.join("data", "embedding_store.sqlite")
+
+
+def chunk_id(text: str, metadata: dict) -> str:
+    """Content hash of a chunk: identical text and metadata always map to the same id."""
+    payload = json.dumps(metadata, sort_keys=True, default=str) + "\x1f" + text
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# -------------------
+# Persistent Embedding Store
+# -------------------
+class EmbeddingStore:
+    """
+    Chunk-hash -> vector cache kept across index builds.
+
+    Vectors are stored per embedding model, so switching models never reuses
+    stale vectors. Safe to share between the build's parser loop and its
+    background embedding thread.
+    """
+
+    def __init__(self, model_name: str, path: str = EMBEDDING_STORE_PATH):
+        self.model_name = model_name
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " chunk_id TEXT NOT NULL,"
+            " model TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (chunk_id, model))"
+        )
+        self._conn.commit()
+
+    def _select(self, columns: str, ids):
+        ids = list(ids)
+        rows = []
+        with self._lock:
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows += self._conn.execute(
+                    f"SELECT {columns} FROM embeddings WHERE model = ? AND chunk_id IN ({placeholders})",
+                    [self.model_name, *batch],
+                ).fetchall()
+        return rows
+
+    def get_many(self, ids) -> dict:
+        return {cid: np.frombuffer(blob, dtype=np.float32) for cid, blob in self._select("chunk_id, vector", ids)}
+
+    def missing(self, ids) -> list:
+        """Ids from ``ids`` that have no stored vector, in input order."""
+        present = {cid for (cid,) in self._select("chunk_id", ids)}
+        return [cid for cid in ids if cid not in present]
+
+    def put_many(self, items):
+        rows = [(cid, self.model_name, np.asarray(vec, dtype=np.float32).tobytes()) for cid, vec in items]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (chunk_id, model, vector) VALUES (?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def prune(self, keep_ids) -> int:
+        """Deletes vectors of this model whose chunk is no longer in ``keep_ids``."""
+        keep_ids = set(keep_ids)
+        with self._lock:
+            stored = [cid for (cid,) in self._conn.execute(
+                "SELECT chunk_id FROM embeddings WHERE model = ?", (self.model_name,))]
+            stale = [cid for cid in stored if cid not in keep_ids]
+            self._conn.executemany(
+                "DELETE FROM embeddings WHERE model = ? AND chunk_id = ?",
+                [(self.model_name, cid) for cid in stale],
+            )
+            self._conn.commit()
+        return len(stale)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,172 @@
+import json
+import math
+import os
+import time
+
+import faiss
+import numpy as np
+
+
+# -------------------
+# Index types & defaults
+# -------------------
+INDEX_META_FILE = "index_meta.json"
+INDEX_TYPES = ("flat", "hnsw", "ivfpq", "sq8")
+
+DEFAULT_PARAMS = {
+    "flat": {},
+    "hnsw": {"m": 32, "ef_construction": 200, "ef_search": 64},
+    "ivfpq": {"nlist": None, "pq_m": 16, "nbits": 8, "nprobe": 16},
+    "sq8": {},
+}
+
+
+def resolve_params(index_type: str, overrides: dict = None) -> dict:
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type '{index_type}'. Choose from: {', '.join(INDEX_TYPES)}")
+    params = dict(DEFAULT_PARAMS[index_type])
+    params.update({k: v for k, v in (overrides or {}).items() if k in params and v is not None})
+    return params
+
+
+# -------------------
+# Build
+# -------------------
+def build_index(vectors: np.ndarray, index_type: str = "flat", params: dict = None):
+    """
+    Builds, trains and fills a FAISS index (L2 metric, like LangChain's default).
+    Returns ``(index, index_type, params)`` with the parameters actually used;
+    IVF-PQ falls back to flat when there are too few vectors to train it.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    n, dim = vectors.shape
+    params = resolve_params(index_type, params)
+
+    if index_type == "flat":
+        index = faiss.IndexFlatL2(dim)
+    elif index_type == "hnsw":
+        index = faiss.IndexHNSWFlat(dim, params["m"])
+        index.hnsw.efConstruction = params["ef_construction"]
+    elif index_type == "sq8":
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit)
+    else:
+        nlist = params["nlist"] or max(1, int(4 * math.sqrt(n)))
+        nlist = min(nlist, max(1, n // 39))
+        if n < max(2 ** params["nbits"], 39 * nlist) or dim % params["pq_m"]:
+            print(f"[WARN] {n} vectors of dim {dim} cannot train IVF-PQ "
+                  f"(pq_m={params['pq_m']}, nbits={params['nbits']}); using a flat index.")
+            return build_index(vectors, "flat")
+        params["nlist"] = nlist
+        quantizer = faiss.IndexFlatL2(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, params["pq_m"], params["nbits"])
+
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    apply_search_params(index, index_type, params)
+    return index, index_type, params
+
+
+def apply_search_params(index, index_type: str, params: dict):
+    """Sets query-time knobs that FAISS does not persist with the index."""
+    if index_type == "hnsw" and params.get("ef_search"):
+        faiss.downcast_index(index).hnsw.efSearch = params["ef_search"]
+    elif index_type == "ivfpq" and params.get("nprobe"):
+        faiss.extract_index_ivf(index).nprobe = params["nprobe"]
+
+
+# -------------------
+# Memory-mapped loading
+# -------------------
+def read_index_mmap(path: str):
+    """
+    Opens an index without copying its vectors into the process heap. The file
+    is mapped read-only, so every process serving the same index shares one copy
+    through the OS page cache. Falls back to a regular read for index types or
+    FAISS builds that cannot be mapped.
+    """
+    flags = [faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY]
+    if hasattr(faiss, "IO_FLAG_MMAP_IFC"):
+        flags.insert(0, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+    for flag in flags:
+        try:
+            return faiss.read_index(path, flag)
+        except RuntimeError:
+            continue
+    return faiss.read_index(path)
+
+
+# -------------------
+# Metadata
+# -------------------
+def write_index_meta(index_dir: str, meta: dict):
+    with open(os.path.join(index_dir, INDEX_META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+
+def read_index_meta(index_dir: str) -> dict:
+    path = os.path.join(index_dir, INDEX_META_FILE)
+    if not os.path.exists(path):
+        return {"index_type": "flat", "params": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+# -------------------
+# Recall / latency / memory report
+# -------------------
+def index_memory_bytes(index) -> int:
+    return int(faiss.serialize_index(index).nbytes)
+
+
+def compare_index_types(vectors: np.ndarray, index_types=INDEX_TYPES, k: int = 10,
+                        n_queries: int = 200, params: dict = None, seed: int = 0) -> list:
+    """
+    Holds out ``n_queries`` vectors as queries, builds every index type over the
+    rest and measures recall@k against exact (flat) search, mean query latency
+    and serialized index size.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    n_queries = min(n_queries, max(1, len(vectors) // 10))
+    perm = rng.permutation(len(vectors))
+    queries, base = vectors[perm[:n_queries]], vectors[perm[n_queries:]]
+    k = min(k, len(base))
+
+    exact = faiss.IndexFlatL2(base.shape[1])
+    exact.add(base)
+    _, truth = exact.search(queries, k)
+
+    rows = []
+    for index_type in index_types:
+        start = time.perf_counter()
+        index, used_type, used_params = build_index(base, index_type, (params or {}).get(index_type))
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for q in queries:
+            index.search(q[None, :], k)
+        latency_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+        _, found = index.search(queries, k)
+        hits = sum(len(set(f) & set(t)) for f, t in zip(found, truth))
+        rows.append({
+            "index_type": used_type,
+            "params": used_params,
+            f"recall@{k}": hits / (len(queries) * k),
+            "latency_ms": latency_ms,
+            "memory_mb": index_memory_bytes(index) / 1e6,
+            "build_s": build_s,
+        })
+    return rows
+
+
+def format_report(rows: list) -> str:
+    recall_key = next(key for key in rows[0] if key.startswith("recall@"))
+    lines = [f"{'index':<8} {recall_key:>10} {'ms/query':>9} {'memory MB':>10} {'build s':>8}  params"]
+    for row in rows:
+        lines.append(
+            f"{row['index_type']:<8} {row[recall_key]:>10.3f} {row['latency_ms']:>9.3f} "
+            f"{row['memory_mb']:>10.2f} {row['build_s']:>8.2f}  {row['params']}"
+        )
+    return "\n".join(lines)
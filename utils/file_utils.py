@@ -0,0 +1,102 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, staging dirs still keep writers apart
+    fcntl = None
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+# -------------------
+# Inter-process locking
+# -------------------
+@contextmanager
+def file_lock(path: str):
+    """Exclusive lock across processes, held on ``path`` (created if missing)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# -------------------
+# Versioned directories
+# -------------------
+# A published directory holds one subdirectory per build plus a CURRENT file
+# naming the live one. Builds are written to a fresh staging directory and
+# CURRENT is replaced last, in a single rename, so readers see either the old
+# build or the new one, never a mix of both.
+CURRENT_FILE = "CURRENT"
+BUILD_PREFIX = "build-"
+
+
+def atomic_write_text(path: str, text: str):
+    """Writes ``text`` through a unique temp file and a rename."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates owner-only files
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def make_build_dir(root: str) -> str:
+    """New, uniquely named build directory under ``root``; not visible to readers until published."""
+    os.makedirs(root, exist_ok=True)
+    build_dir = tempfile.mkdtemp(dir=root, prefix=BUILD_PREFIX)
+    os.chmod(build_dir, 0o755)
+    return build_dir
+
+
+def current_build_dir(root: str):
+    """Path of the live build under ``root``, or None if nothing was published."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except OSError:
+        return None
+    path = os.path.join(root, name)
+    return path if name and os.path.isdir(path) else None
+
+
+def publish_build_dir(root: str, build_dir: str, keep: int = 2):
+    """
+    Makes ``build_dir`` the live build and deletes older builds, keeping the
+    newest ``keep`` (a reader may still be loading the previous one). Call it
+    under the root's ``file_lock`` so another writer's staging build is not
+    taken for an old one.
+    """
+    atomic_write_text(os.path.join(root, CURRENT_FILE), os.path.basename(build_dir))
+    builds = sorted(
+        (entry for entry in os.scandir(root) if entry.is_dir() and entry.name.startswith(BUILD_PREFIX)),
+        key=lambda entry: entry.stat().st_mtime_ns, reverse=True,
+    )
+    live = os.path.basename(build_dir)
+    stale = [entry.path for entry in builds if entry.name != live][max(keep - 1, 0):]
+    for path in stale:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def resolve_build_dir(root: str) -> str:
+    """The live build under ``root``, or ``root`` itself for a directory published before builds were versioned."""
+    return current_build_dir(root) or root
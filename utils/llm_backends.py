@@ -0,0 +1,161 @@
+import json
+import os
+import time
+from typing import Iterator, Optional
+
+
+# -------------------
+# Config
+# -------------------
+GEMINI_MODEL = "gemini-1.5-flash"
+DEFAULT_MAX_NEW_TOKENS = 2048
+DEFAULT_TEMPERATURE = 0.2
+HTTP_LLM_URL = "http://127.0.0.1:8808"
+
+
+# -------------------
+# Backend Interface
+# -------------------
+class LLMBackend:
+    """
+    Minimal text-generation interface used by the Q&A pipeline.
+
+    Backends implement ``stream``; ``generate`` joins the streamed pieces
+    unless a backend has a cheaper non-streaming call.
+    """
+
+    name = "base"
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        raise NotImplementedError
+
+    def generate(self, prompt: str) -> str:
+        return "".join(self.stream(prompt)).strip()
+
+
+class GeminiBackend(LLMBackend):
+    name = "gemini"
+
+    def __init__(self, model_name: str = GEMINI_MODEL, max_output_tokens: int = DEFAULT_MAX_NEW_TOKENS,
+                 temperature: float = DEFAULT_TEMPERATURE, api_key: Optional[str] = None):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key or os.getenv("GEMINI_API_KEY"))
+        self.model = genai.GenerativeModel(model_name)
+        self.generation_config = {"max_output_tokens": max_output_tokens, "temperature": temperature}
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        response = self.model.generate_content(prompt, generation_config=self.generation_config, stream=True)
+        for chunk in response:
+            if chunk.candidates and chunk.candidates[0].content.parts:
+                yield chunk.candidates[0].content.parts[0].text
+
+    def generate(self, prompt: str) -> str:
+        response = self.model.generate_content(prompt, generation_config=self.generation_config)
+        if not response.candidates or not response.candidates[0].content.parts:
+            return ""
+        return response.candidates[0].content.parts[0].text.strip()
+
+
+class FakeStreamingBackend(LLMBackend):
+    """
+    Offline stand-in for Gemini. Streams a canned (or echoed) answer word by word
+    with configurable delays, so UI streaming and time-to-first-token can be
+    exercised without network access.
+    """
+
+    name = "fake"
+
+    def __init__(self, response: Optional[str] = None, first_token_delay: float = 0.2,
+                 token_delay: float = 0.02, words_per_chunk: int = 3):
+        self.response = response
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.words_per_chunk = words_per_chunk
+
+    def _answer_for(self, prompt: str) -> str:
+        if self.response is not None:
+            return self.response
+        question = prompt.rsplit("User Question:", 1)[-1].split("\n\n", 1)[0].strip()
+        return f"**Offline answer** for: {question or 'your question'}. " + "This is placeholder text. " * 20
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        words = self._answer_for(prompt).split(" ")
+        time.sleep(self.first_token_delay)
+        for i in range(0, len(words), self.words_per_chunk):
+            if i:
+                time.sleep(self.token_delay)
+            piece = " ".join(words[i:i + self.words_per_chunk])
+            yield piece if i == 0 else " " + piece
+
+
+class HTTPBackend(LLMBackend):
+    """
+    Generic JSON-over-HTTP backend, e.g. ``mock_llm_server.py`` for offline load
+    tests. ``POST /stream`` returns one JSON object per line with a ``text`` field.
+    """
+
+    name = "http"
+
+    def __init__(self, url: Optional[str] = None, timeout: float = 120.0):
+        import requests
+
+        self.url = (url or os.getenv("MEDBOT_LLM_URL") or HTTP_LLM_URL).rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        with self.session.post(f"{self.url}/stream", json={"prompt": prompt},
+                               stream=True, timeout=self.timeout) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)["text"]
+
+
+# -------------------
+# Stream timing
+# -------------------
+class TimedStream:
+    """
+    Wraps a token stream and records time-to-first-token and total time.
+
+        stream = TimedStream(backend.stream(prompt))
+        for piece in stream: ...
+        stream.ttft, stream.total_time, stream.chunks
+    """
+
+    def __init__(self, pieces: Iterator[str]):
+        self._pieces = pieces
+        self.start = time.perf_counter()
+        self.ttft = None
+        self.total_time = None
+        self.chunks = 0
+        self.chars = 0
+
+    def __iter__(self):
+        for piece in self._pieces:
+            if self.ttft is None:
+                self.ttft = time.perf_counter() - self.start
+            self.chunks += 1
+            self.chars += len(piece)
+            yield piece
+        self.total_time = time.perf_counter() - self.start
+
+
+# -------------------
+# Backend selection
+# -------------------
+BACKENDS = {
+    "gemini": GeminiBackend,
+    "fake": FakeStreamingBackend,
+    "http": HTTPBackend,
+}
+
+
+def get_backend(name: Optional[str] = None, **kwargs) -> LLMBackend:
+    """Builds the backend named by ``name`` or ``MEDBOT_LLM_BACKEND`` (default: gemini)."""
+    name = (name or os.getenv("MEDBOT_LLM_BACKEND") or "gemini").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,70 @@
+import os
+
+from utils.file_utils import atomic_write_text, file_sha256
+
+
+# -------------------
+# Paths & Config
+# -------------------
+PDF_CACHE_DIR = os.path.join("data", ".cache", "pdf_pages")
+PAGES_PER_SHARD = 50
+
+
+def _pdf_reader(path: str):
+    try:
+        from pypdf import PdfReader
+    except ImportError:  # older installs only have the PyPDF2 name
+        from PyPDF2 import PdfReader
+    return PdfReader(path)
+
+
+def page_count(path: str) -> int:
+    return len(_pdf_reader(path).pages)
+
+
+def page_shards(n_pages: int, pages_per_shard: int = PAGES_PER_SHARD) -> list:
+    """Half-open ``(start, end)`` page ranges covering the document."""
+    return [(start, min(start + pages_per_shard, n_pages)) for start in range(0, n_pages, pages_per_shard)]
+
+
+def plan_pdf_shards(path: str, pages_per_shard: int = PAGES_PER_SHARD):
+    """Content hash of the PDF and its page shards, computed once in the parent process."""
+    return file_sha256(path), page_shards(page_count(path), pages_per_shard)
+
+
+# -------------------
+# Page text cache
+# -------------------
+def _page_path(cache_dir: str, pdf_hash: str, page: int) -> str:
+    return os.path.join(cache_dir, pdf_hash, f"{page:06d}.txt")
+
+
+def extract_pages(path: str, pdf_hash: str, start: int, end: int, cache_dir: str = PDF_CACHE_DIR) -> list:
+    """
+    Text of pages ``start``..``end - 1`` as ``(page, text)`` pairs (0-based page
+    numbers). Pages are read from ``cache_dir/<pdf hash>/`` when present;
+    the PDF is only opened for pages missing from the cache, which are then
+    written there for later builds.
+    """
+    pages, missing = [], []
+    for page in range(start, end):
+        cached = _page_path(cache_dir, pdf_hash, page)
+        if os.path.exists(cached):
+            with open(cached, "r", encoding="utf-8") as f:
+                pages.append((page, f.read()))
+        else:
+            missing.append(page)
+
+    if missing:
+        reader = _pdf_reader(path)
+        os.makedirs(os.path.join(cache_dir, pdf_hash), exist_ok=True)
+        for page in missing:
+            try:
+                text = reader.pages[page].extract_text() or ""
+            except Exception as e:
+                print(f"[SKIP] Failed to extract page {page + 1} of {path}: {e}")
+                continue
+            atomic_write_text(_page_path(cache_dir, pdf_hash, page), text)
+            pages.append((page, text))
+        pages.sort()
+    return pages
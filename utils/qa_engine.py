@@ -0,0 +1,264 @@
+import asyncio
+import contextvars
+import os
+import queue
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from prompts.prompt_templates import build_rag_prompt
+from utils.answer_store import get_answer_store
+from utils.llm_backends import get_backend
+from utils.rag_retriever import retrieve_context, get_retriever_service
+from utils.response_cache import get_response_cache, context_key
+from utils.telemetry import span, record_span, incr, start_trace, estimate_tokens
+
+
+# -------------------
+# Config
+# -------------------
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("MEDBOT_LLM_CONCURRENCY", "4"))
+MAX_PENDING_REQUESTS = 64
+LLM_TIMEOUT_SECONDS = 60.0
+LLM_RETRIES = 2
+RETRY_BACKOFF_SECONDS = 0.5
+RETRY_BACKOFF_MAX_SECONDS = 8.0
+
+_DONE = object()
+
+
+class EngineBusy(RuntimeError):
+    """Raised when more distinct questions are pending than the engine accepts."""
+
+
+def question_key(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+# -------------------
+# Async Q&A Engine
+# -------------------
+class QAEngine:
+    """
+    Asyncio request engine for RAG Q&A.
+
+    Retrieval, cache lookups and the LLM call run in the engine's own thread
+    pool so many requests overlap, while a semaphore caps concurrent LLM calls.
+    Each call has a timeout and is retried with exponential backoff and full jitter, unless
+    part of the answer was already streamed. Identical questions in flight share
+    one pipeline run. Past ``max_pending`` distinct questions new requests are
+    rejected with ``EngineBusy`` instead of queueing without bound.
+
+    Use ``await engine.answer(q)`` from async code, or ``engine.start()`` and
+    then ``engine.submit(q)`` / ``engine.stream(q)`` from threads such as the
+    Streamlit script.
+    """
+
+    def __init__(self, backend=None, retrieve=retrieve_context, use_cache: bool = True, use_answers: bool = True,
+                 max_concurrency: int = MAX_CONCURRENT_LLM_CALLS, max_pending: int = MAX_PENDING_REQUESTS,
+                 timeout: float = LLM_TIMEOUT_SECONDS, retries: int = LLM_RETRIES,
+                 backoff: float = RETRY_BACKOFF_SECONDS, max_backoff: float = RETRY_BACKOFF_MAX_SECONDS):
+        self.backend = backend if backend is not None else get_backend()
+        self.retrieve = retrieve
+        self.use_cache = use_cache
+        self.use_answers = use_answers
+        self.max_concurrency = max_concurrency
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._llm_slots = asyncio.Semaphore(max_concurrency)
+        # Room for every LLM slot plus retrieval / cache work of queued requests
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency + 8, thread_name_prefix="qa-engine")
+        self._inflight = {}
+        self._loop = None
+        self._thread = None
+        self.counters = {
+            "requests": 0, "coalesced": 0, "precomputed_hits": 0, "cache_hits": 0, "llm_calls": 0,
+            "retries": 0, "timeouts": 0, "failures": 0, "rejected": 0,
+        }
+
+    # -------------------
+    # Async API
+    # -------------------
+    async def answer(self, question: str, on_piece=None) -> dict:
+        """
+        Runs retrieval, prompt building and the LLM call for ``question``.
+        ``on_piece`` is called with each streamed text piece. Returns a dict with
+        answer, prompt, context_items, cached, precomputed, coalesced, attempts and latency.
+        """
+        self._count("requests")
+        key = question_key(question)
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count("coalesced")
+            result = await asyncio.shield(task)
+            return {**result, "coalesced": True}
+
+        if len(self._inflight) >= self.max_pending:
+            self._count("rejected")
+            raise EngineBusy(f"{len(self._inflight)} questions already pending")
+
+        task = asyncio.ensure_future(self._run(question, on_piece))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _run(self, question: str, on_piece) -> dict:
+        with start_trace("qa.request") as trace:
+            result = await self._pipeline(question, on_piece)
+        result["trace"] = trace.to_dict()
+        return result
+
+    async def _pipeline(self, question: str, on_piece) -> dict:
+        start = time.perf_counter()
+        embedding = None
+
+        with span("retrieve"):
+            context_str, context_items = await self._in_thread(self.retrieve, question)
+        ctx_key = context_key(context_items)
+
+        # Frequent questions answered offline by precompute_answers.py over the same chunks: no LLM call
+        if self.use_answers:
+            embedding = await self._in_thread(get_retriever_service().embed_query, question)
+            with span("answers.lookup"):
+                stored = await self._in_thread(get_answer_store().lookup, embedding, ctx_key)
+            if stored is not None:
+                self._count("precomputed_hits")
+                return {
+                    "question": question, "prompt": "", "context_items": stored["context_items"],
+                    "answer": stored["answer"], "cached": True, "precomputed": True, "coalesced": False,
+                    "attempts": 0, "latency": time.perf_counter() - start,
+                }
+
+        with span("prompt.build"):
+            prompt = build_rag_prompt(question, context_str)
+        result = {
+            "question": question, "prompt": prompt, "context_items": context_items,
+            "answer": "", "cached": False, "precomputed": False, "coalesced": False, "attempts": 0,
+        }
+
+        # Reuse answers for the same prompt, or for a near-identical question over the same chunks
+        if self.use_cache:
+            cache = get_response_cache()
+            if embedding is None:
+                embedding = await self._in_thread(get_retriever_service().embed_query, question)
+            with span("cache.lookup"):
+                cached = await self._in_thread(cache.get, prompt, embedding, ctx_key)
+            if cached is not None:
+                self._count("cache_hits")
+                result.update(answer=cached, cached=True, latency=time.perf_counter() - start)
+                return result
+
+        try:
+            result["answer"], result["attempts"] = await self._call_llm(prompt, on_piece)
+        except Exception:
+            self._count("failures")
+            raise
+        incr("llm_tokens_total", estimate_tokens(prompt), kind="prompt")
+        incr("llm_tokens_total", estimate_tokens(result["answer"]), kind="completion")
+        if self.use_cache and result["answer"]:
+            with span("cache.store"):
+                await self._in_thread(cache.put, prompt, result["answer"], embedding, ctx_key)
+        result["latency"] = time.perf_counter() - start
+        return result
+
+    async def _call_llm(self, prompt: str, on_piece):
+        for attempt in range(self.retries + 1):
+            emitted = []
+            cancelled = threading.Event()
+            queued = time.perf_counter()
+            await self._llm_slots.acquire()
+            record_span("llm.queue", queued, time.perf_counter() - queued)
+            self._count("llm_calls")
+            call = self._in_thread(self._generate, prompt, on_piece, emitted, cancelled)
+            # The slot is freed when the call really ends, so timed-out calls still
+            # count toward the limit until the backend lets go of them.
+            call.add_done_callback(lambda _: self._llm_slots.release())
+            try:
+                with span("llm.generate", attempt=attempt + 1):
+                    answer = await asyncio.wait_for(asyncio.shield(call), self.timeout)
+                return answer, attempt + 1
+            except Exception as e:
+                cancelled.set()
+                if isinstance(e, asyncio.TimeoutError):
+                    self._count("timeouts")
+                    e = TimeoutError(f"LLM call timed out after {self.timeout:.0f}s")
+                # A half-streamed answer cannot be retried without duplicating text
+                if emitted or attempt == self.retries:
+                    raise e
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                self._count("retries")
+                print(f"[WARN] LLM call failed ({e}); retry {attempt + 1}/{self.retries} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+
+    def _count(self, name: str):
+        self.counters[name] += 1
+        incr("qa_events_total", event=name)
+
+    def _in_thread(self, fn, *args):
+        # Copy the context so spans recorded in the worker land in the request's trace
+        context = contextvars.copy_context()
+        return asyncio.get_running_loop().run_in_executor(self._executor, context.run, fn, *args)
+
+    def _generate(self, prompt: str, on_piece, emitted: list, cancelled: threading.Event) -> str:
+        parts = []
+        start = time.perf_counter()
+        for piece in self.backend.stream(prompt):
+            if cancelled.is_set():
+                break
+            if not parts:
+                record_span("llm.first_token", start, time.perf_counter() - start)
+            parts.append(piece)
+            if on_piece is not None:
+                emitted.append(True)
+                on_piece(piece)
+        return "".join(parts).strip()
+
+    # -------------------
+    # Background loop for synchronous callers
+    # -------------------
+    def start(self) -> "QAEngine":
+        """Runs the engine's event loop in a daemon thread."""
+        if self._thread is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name="qa-engine", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, question: str, on_piece=None):
+        """Schedules ``answer`` on the background loop. Returns a concurrent Future."""
+        if self._loop is None:
+            raise RuntimeError("QAEngine.start() must be called before submit()")
+        return asyncio.run_coroutine_threadsafe(self.answer(question, on_piece), self._loop)
+
+    def stream(self, question: str) -> "QAStream":
+        return QAStream(self, question)
+
+
+class QAStream:
+    """
+    Blocking iterator over the answer pieces of one engine request. After the
+    iteration ends, ``result`` holds the engine's result dict. Answers served
+    from the cache or a coalesced request arrive as a single piece.
+    """
+
+    def __init__(self, engine: QAEngine, question: str):
+        self._pieces = queue.Queue()
+        self._future = engine.submit(question, on_piece=self._pieces.put)
+        self._future.add_done_callback(lambda _: self._pieces.put(_DONE))
+        self.result = None
+
+    def __iter__(self):
+        streamed = False
+        while True:
+            piece = self._pieces.get()
+            if piece is _DONE:
+                break
+            streamed = True
+            yield piece
+        self.result = self._future.result()
+        if not streamed and self.result["answer"]:
+            yield self.result["answer"]
@@ -1,48 +1,318 @@
+import os
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+from langchain.docstore.document import Document
 from langchain_community.vectorstores import FAISS
 from langchain_huggingface import HuggingFaceEmbeddings
 
+from utils.bm25 import BM25_FILE, BM25Index, reciprocal_rank_fusion
+from utils.faiss_index import read_index_meta, apply_search_params, read_index_mmap
+from utils.chunk_store import CHUNK_STORE_FILE, SQLiteChunkStore, SQLiteDocstore, PositionIdMap
+from utils.context_packer import CONTEXT_TOKEN_BUDGET, PROMPT_TOKEN_BUDGET, context_budget, pack_context
+from utils.file_utils import resolve_build_dir
+from utils.telemetry import span
+
 
 # -------------------
 # Paths & Config
 # -------------------
-INDEX_DIR = "data/langchain_index"
+INDEX_DIR = os.getenv("MEDBOT_INDEX_DIR", "data/langchain_index")
 EMBED_MODEL = "all-MiniLM-L6-v2"
+RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+INDEX_FILE = "index.faiss"
+INDEX_FILES = (INDEX_FILE, "index.pkl", CHUNK_STORE_FILE, BM25_FILE)
+RELOAD_CHECK_SECONDS = 30.0
+QUERY_EMBED_CACHE_SIZE = 512
+
+# Hybrid retrieval
+HYBRID_CANDIDATES = 20  # hits taken from each of dense and BM25 before fusion
+RERANK_POOL = 10        # fused candidates passed to the cross-encoder
+RERANK_ENABLED = os.getenv("MEDBOT_RERANK", "0") == "1"
+
+# Per-stage latency budgets in milliseconds. Dense search always runs; BM25 is
+# skipped when its budget no longer fits in the total, and the re-rank pool is
+# shrunk to what is left of it.
+STAGE_BUDGETS_MS = {
+    "dense": 150.0,
+    "bm25": 50.0,
+    "rerank": 300.0,
+    "total": 500.0,
+}
+
+
+# -------------------
+# Resident Retriever Service
+# -------------------
+class RetrieverService:
+    """
+    Process-wide holder for the embedding model, FAISS index and BM25 index.
+
+    The model and indexes are loaded once and shared by every Streamlit session
+    and thread. A newly built index under ``index_dir`` is picked up by
+    ``reload_if_changed`` and swapped in atomically; queries already running
+    keep their reference to the previous indexes until they finish. Every file
+    is loaded from the one build the index's CURRENT pointer names, so the
+    FAISS rows, chunk store and BM25 index always come from the same build.
+    """
+
+    def __init__(self, index_dir: str = INDEX_DIR, embed_model: str = EMBED_MODEL,
+                 check_interval: float = RELOAD_CHECK_SECONDS, budgets: dict = None):
+        self.index_dir = index_dir
+        self.embed_model = embed_model
+        self.check_interval = check_interval
+        self.budgets = {**STAGE_BUDGETS_MS, **(budgets or {})}
+        self._lock = threading.Lock()
+        self._embeddings = None
+        self._reranker = None
+        self._resident = None  # (vectorstore, bm25 or None), swapped as one unit
+        self._index_stamp = None
+        self._last_check = 0.0
+        self._rerank_ms_per_pair = None
+        # Recent question embeddings, shared by retrieval and the response cache
+        self.embed_query = lru_cache(maxsize=QUERY_EMBED_CACHE_SIZE)(self._embed_query)
+
+    def _current_stamp(self):
+        """(live build directory, its file stamps), or None if there is no index."""
+        build_dir = resolve_build_dir(self.index_dir)
+        if not os.path.exists(os.path.join(build_dir, INDEX_FILE)):
+            return None
+        stamp = []
+        for name in INDEX_FILES:
+            path = os.path.join(build_dir, name)
+            if os.path.exists(path):
+                st = os.stat(path)
+                stamp.append((name, st.st_mtime_ns, st.st_size))
+        return build_dir, tuple(stamp)
+
+    def _get_embeddings(self):
+        if self._embeddings is None:
+            with span("model.load"):
+                self._embeddings = HuggingFaceEmbeddings(model_name=self.embed_model)
+        return self._embeddings
+
+    def _load_vectorstore(self, build_dir: str):
+        if os.path.exists(os.path.join(build_dir, CHUNK_STORE_FILE)):
+            # Shared layout: memory-mapped vectors + chunk texts looked up in SQLite
+            store = SQLiteChunkStore(os.path.join(build_dir, CHUNK_STORE_FILE))
+            vectorstore = FAISS(
+                embedding_function=self._get_embeddings(),
+                index=read_index_mmap(os.path.join(build_dir, INDEX_FILE)),
+                docstore=SQLiteDocstore(store),
+                index_to_docstore_id=PositionIdMap(store),
+            )
+        else:
+            vectorstore = FAISS.load_local(
+                build_dir,
+                self._get_embeddings(),
+                allow_dangerous_deserialization=True  # ✅ Safe if index is yours
+            )
+        # HNSW / IVF-PQ query knobs are recorded at build time, not stored in the index
+        meta = read_index_meta(build_dir)
+        apply_search_params(vectorstore.index, meta.get("index_type", "flat"), meta.get("params", {}))
+        return vectorstore
+
+    def _load_resident(self, build_dir: str):
+        bm25_path = os.path.join(build_dir, BM25_FILE)
+        with span("index.load"):
+            bm25 = BM25Index.load(bm25_path) if os.path.exists(bm25_path) else None
+            return self._load_vectorstore(build_dir), bm25
+
+    @property
+    def embeddings(self):
+        with self._lock:
+            return self._get_embeddings()
+
+    def _snapshot(self):
+        if self._resident is not None:
+            if time.monotonic() - self._last_check >= self.check_interval:
+                self.reload_if_changed()
+            return self._resident
+        with self._lock:
+            if self._resident is None:
+                stamp = self._current_stamp()
+                self._resident = self._load_resident(stamp[0] if stamp else resolve_build_dir(self.index_dir))
+                self._index_stamp = stamp
+                self._last_check = time.monotonic()
+            return self._resident
+
+    @property
+    def vectorstore(self):
+        return self._snapshot()[0]
+
+    @property
+    def bm25(self):
+        return self._snapshot()[1]
+
+    def warm(self) -> "RetrieverService":
+        """Load the model and indexes now instead of on the first query."""
+        self._snapshot()
+        return self
+
+    def reload_if_changed(self) -> bool:
+        """Swap in a rebuilt index if the files on disk changed. Returns True on swap."""
+        self._last_check = time.monotonic()
+        stamp = self._current_stamp()
+        if stamp is None or stamp == self._index_stamp:
+            return False
+        with self._lock:
+            if stamp == self._index_stamp:
+                return False
+            try:
+                new_resident = self._load_resident(stamp[0])
+            except Exception as e:
+                print(f"[WARN] Keeping current index, reload failed: {e}")
+                return False
+            # Unversioned index files were rewritten while loading; try again on the next check.
+            if self._current_stamp() != stamp:
+                return False
+            self._resident = new_resident
+            self._index_stamp = stamp
+        print(f"[INFO] Reloaded FAISS index from {self.index_dir}")
+        return True
+
+    def _embed_query(self, query: str) -> tuple:
+        embeddings = self.embeddings
+        with span("embed.query"):
+            return tuple(embeddings.embed_query(query))
+
+    def search(self, query: str, top_k: int = 3):
+        vectorstore = self.vectorstore
+        vector = list(self.embed_query(query))
+        with span("search.dense"):
+            return vectorstore.similarity_search_by_vector(vector, k=top_k)
+
+    # -------------------
+    # Hybrid retrieval
+    # -------------------
+    def _get_reranker(self):
+        if self._reranker is None:
+            with self._lock:
+                if self._reranker is None:
+                    from sentence_transformers import CrossEncoder
+                    self._reranker = CrossEncoder(RERANK_MODEL, device="cpu")
+        return self._reranker
+
+    def _rerank(self, query: str, pool: list, docs: dict) -> list:
+        start = time.perf_counter()
+        scores = self._get_reranker().predict([(query, docs[pos].page_content) for pos in pool])
+        per_pair = _ms_since(start) / len(pool)
+        # Moving average of cross-encoder cost, used to size the next pool
+        previous = self._rerank_ms_per_pair
+        self._rerank_ms_per_pair = per_pair if previous is None else 0.8 * previous + 0.2 * per_pair
+        return [pos for _, pos in sorted(zip(scores, pool), key=lambda p: -p[0])]
+
+    def hybrid_search(self, query: str, top_k: int = 3, candidates: int = HYBRID_CANDIDATES,
+                      rerank: bool = RERANK_ENABLED, rerank_pool: int = RERANK_POOL):
+        """
+        Dense + BM25 retrieval fused with reciprocal-rank fusion, optionally
+        re-ranked by a CPU cross-encoder. Falls back to dense-only when the index
+        was built without BM25. Stage timings are recorded as spans on the
+        active trace.
+        """
+        vectorstore, bm25 = self._snapshot()
+        budgets = self.budgets
+        timings = {}
+        start = time.perf_counter()
+
+        vector = np.asarray([self.embed_query(query)], dtype=np.float32)
+        with span("search.dense"):
+            _, dense_ids = vectorstore.index.search(vector, candidates)
+        rankings = [[int(pos) for pos in dense_ids[0] if pos >= 0]]
+        timings["dense"] = _ms_since(start)
+
+        if bm25 is not None and timings["dense"] + budgets["bm25"] <= budgets["total"]:
+            stage = time.perf_counter()
+            with span("search.bm25"):
+                rankings.append([pos for pos, _ in bm25.search(query, candidates)])
+            timings["bm25"] = _ms_since(stage)
+        fused = reciprocal_rank_fusion(rankings) if len(rankings) > 1 else rankings[0]
+
+        pool = fused[:max(top_k, rerank_pool)]
+        with span("docstore.fetch"):
+            docs = {pos: _doc_at(vectorstore, pos) for pos in pool}
+        missing = {pos for pos, doc in docs.items() if doc is None}
+        if missing:
+            print(f"[WARN] Skipping {len(missing)} index rows without a chunk in the docstore")
+            pool = [pos for pos in pool if pos not in missing]
+            fused = [pos for pos in fused if pos not in missing]
+        if rerank:
+            remaining = min(budgets["rerank"], budgets["total"] - _ms_since(start))
+            if self._rerank_ms_per_pair:
+                pool = pool[:max(0, int(remaining / self._rerank_ms_per_pair))]
+            if len(pool) > 1:
+                stage = time.perf_counter()
+                with span("rerank", pairs=len(pool)):
+                    reranked = self._rerank(query, pool, docs)
+                fused = reranked + [pos for pos in fused if pos not in reranked]
+                timings["rerank"] = _ms_since(stage)
+
+        timings["total"] = _ms_since(start)
+        for name, ms in timings.items():
+            if ms > budgets.get(name, float("inf")):
+                print(f"[WARN] Retrieval stage '{name}' took {ms:.0f} ms (budget {budgets[name]:.0f} ms)")
+        results = []
+        for pos in fused:
+            doc = docs[pos] if pos in docs else _doc_at(vectorstore, pos)
+            if doc is not None:
+                results.append(doc)
+                if len(results) == top_k:
+                    break
+        return results
+
+
+def _ms_since(start: float) -> float:
+    return (time.perf_counter() - start) * 1000
+
+
+def _doc_at(vectorstore, position: int):
+    """The chunk at a FAISS row, or None when the row has no chunk (docstores return a message string then)."""
+    try:
+        doc = vectorstore.docstore.search(vectorstore.index_to_docstore_id[position])
+    except KeyError:
+        return None
+    return doc if isinstance(doc, Document) else None
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_retriever_service() -> RetrieverService:
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = RetrieverService()
+    return _service
+
 
 # -------------------
 # LangChain Retriever
 # -------------------
 def get_langchain_retriever(top_k: int = 3):
-    embedding_model = HuggingFaceEmbeddings(model_name=EMBED_MODEL)
-    vectorstore = FAISS.load_local(
-    INDEX_DIR,
-    embedding_model,
-    allow_dangerous_deserialization=True  # ✅ Safe if index is yours
-)
-
+    vectorstore = get_retriever_service().vectorstore
     retriever = vectorstore.as_retriever(search_kwargs={"k": top_k})
     return retriever
 
 # -------------------
 # Retrieve Function
 # -------------------
-def retrieve_context(query: str, top_k: int = 3, max_context_chars: int = 1200):
-    retriever = get_langchain_retriever(top_k)
-    docs = retriever.invoke(query)
-
-    selected_chunks = []
-    context_items = []
-    total_len = 0
-
-    for doc in docs:
-        chunk = doc.page_content
-        c_len = len(chunk)
-        if total_len + c_len > max_context_chars:
-            chunk = chunk[: max_context_chars - total_len] + "..."
-        selected_chunks.append(chunk)
-        context_items.append((doc.metadata.get("source", "Unknown"), chunk))
-        total_len += len(chunk)
-        if total_len >= max_context_chars:
-            break
-
-    context_str = "\n\n---\n\n".join(selected_chunks)
-    return context_str, context_items  # ✅ return both
+def retrieve_context(query: str, top_k: int = 3, max_context_tokens: int = CONTEXT_TOKEN_BUDGET,
+                     hybrid: bool = True, rerank: bool = RERANK_ENABLED,
+                     prompt_token_budget: int = PROMPT_TOKEN_BUDGET):
+    """
+    Retrieves the top chunks for ``query`` and packs whole sentences from them
+    into at most ``max_context_tokens`` tokens (less if the prompt preamble
+    would push the full prompt past ``prompt_token_budget``).
+    """
+    service = get_retriever_service()
+    if hybrid:
+        docs = service.hybrid_search(query, top_k, rerank=rerank)
+    else:
+        docs = service.search(query, top_k)
+
+    budget = context_budget(query, max_context_tokens, prompt_token_budget)
+    return pack_context(query, docs, budget)
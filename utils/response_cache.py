@@ -0,0 +1,169 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from utils.telemetry import incr
+
+
+# -------------------
+# Paths & Config
+# -------------------
+CACHE_PATH = os.path.join("data", "response_cache.sqlite")
+CACHE_TTL_SECONDS = 7 * 24 * 3600
+CACHE_MAX_ENTRIES = 2000
+SIMILARITY_THRESHOLD = 0.92
+
+
+def hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def context_key(context_items) -> str:
+    """Identity of the retrieved chunks, independent of the question wording."""
+    return hash_text("\x1f".join(f"{source}\x1e{chunk}" for source, chunk in context_items))
+
+
+# -------------------
+# Response Cache
+# -------------------
+class ResponseCache:
+    """
+    SQLite-backed LLM response cache with TTL and LRU eviction.
+
+    Entries are looked up by the exact prompt hash first. If a question
+    embedding and context key are given, a miss falls back to the closest
+    cached question that retrieved the same chunks, accepted when its cosine
+    similarity is at least ``similarity_threshold``.
+    """
+
+    def __init__(self, path: str = CACHE_PATH, ttl_seconds: float = CACHE_TTL_SECONDS,
+                 max_entries: int = CACHE_MAX_ENTRIES, similarity_threshold: float = SIMILARITY_THRESHOLD):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " prompt_key TEXT PRIMARY KEY,"
+            " context_key TEXT,"
+            " embedding BLOB,"
+            " answer TEXT NOT NULL,"
+            " created REAL NOT NULL,"
+            " last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_context ON responses (context_key)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_access ON responses (last_access)")
+        self._conn.commit()
+
+    def get(self, prompt: str, question_embedding=None, ctx_key: str = None):
+        """Returns the cached answer or None."""
+        now = time.time()
+        min_created = now - self.ttl_seconds
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT prompt_key, answer FROM responses WHERE prompt_key = ? AND created >= ?",
+                (hash_text(prompt), min_created),
+            ).fetchone()
+            semantic = False
+            if row is None and question_embedding is not None and ctx_key:
+                row = self._nearest(question_embedding, ctx_key, min_created)
+                semantic = row is not None
+
+            if row is None:
+                self.misses += 1
+                incr("cache_lookups_total", result="miss")
+                return None
+
+            self._conn.execute("UPDATE responses SET last_access = ? WHERE prompt_key = ?", (now, row[0]))
+            self._conn.commit()
+            self.hits += 1
+            self.semantic_hits += semantic
+            incr("cache_lookups_total", result="semantic_hit" if semantic else "hit")
+            return row[1]
+
+    def _nearest(self, question_embedding, ctx_key: str, min_created: float):
+        rows = self._conn.execute(
+            "SELECT prompt_key, answer, embedding FROM responses"
+            " WHERE context_key = ? AND embedding IS NOT NULL AND created >= ?",
+            (ctx_key, min_created),
+        ).fetchall()
+        if not rows:
+            return None
+        query = _unit(np.asarray(question_embedding, dtype=np.float32))
+        cached = np.stack([np.frombuffer(r[2], dtype=np.float32) for r in rows])
+        sims = cached @ query
+        best = int(np.argmax(sims))
+        if sims[best] < self.similarity_threshold:
+            return None
+        return rows[best][0], rows[best][1]
+
+    def put(self, prompt: str, answer: str, question_embedding=None, ctx_key: str = None):
+        now = time.time()
+        embedding = None
+        if question_embedding is not None:
+            embedding = _unit(np.asarray(question_embedding, dtype=np.float32)).tobytes()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (prompt_key, context_key, embedding, answer, created, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (hash_text(prompt), ctx_key, embedding, answer, now, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float):
+        self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        self._conn.execute(
+            "DELETE FROM responses WHERE prompt_key IN ("
+            " SELECT prompt_key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": size,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+
+def _unit(vec: np.ndarray) -> np.ndarray:
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache()
+    return _cache
@@ -1,8 +1,10 @@
 import os
+import threading
 from dotenv import load_dotenv
-from langchain.memory import ConversationBufferMemory
 from langchain.agents import initialize_agent, AgentType, Tool
+from langchain.prompts import MessagesPlaceholder
 from langchain_google_genai import ChatGoogleGenerativeAI
+from utils.llm_backends import GEMINI_MODEL, DEFAULT_TEMPERATURE
 from utils.symptom_checker import predict_diseases, format_symptom_response
 
 # -------------------
@@ -11,18 +13,25 @@ from utils.symptom_checker import predict_diseases, format_symptom_response
 load_dotenv()
 
 # -------------------
-# Initialize Gemini LLM
+# Shared Gemini LLM
 # -------------------
-llm = ChatGoogleGenerativeAI(
-    model="gemini-1.5-flash",
-    temperature=0.2,
-    convert_system_message_to_human=True
-)
+# Built on first use and shared by every agent; nothing is created at import time.
+_llm = None
+_llm_lock = threading.Lock()
 
-# -------------------
-# Store chat history
-# -------------------
-memory = ConversationBufferMemory(memory_key="chat_history", return_messages=True)
+
+def get_llm() -> ChatGoogleGenerativeAI:
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = ChatGoogleGenerativeAI(
+                    model=GEMINI_MODEL,
+                    google_api_key=os.getenv("GEMINI_API_KEY"),
+                    temperature=DEFAULT_TEMPERATURE,
+                    convert_system_message_to_human=True,
+                )
+    return _llm
 
 # -------------------
 # Define LangChain Tool
@@ -36,14 +45,21 @@ def symptom_tool() -> Tool:
     )
 
 # -------------------
-# Initialize LangChain Agent
+# Agent factory
 # -------------------
-tools = [symptom_tool()]
-
-agent = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True,
-    memory=memory,
-)
+def build_agent(llm=None, tools=None, verbose: bool = False):
+    """
+    Builds a stateless agent executor. Conversation history is not stored on the
+    agent: callers pass it per call as ``chat_history`` (a list of messages), so
+    one executor can serve many sessions (see ``utils.agent_pool``).
+    """
+    return initialize_agent(
+        tools=tools or [symptom_tool()],
+        llm=llm or get_llm(),
+        agent=AgentType.STRUCTURED_CHAT_ZERO_SHOT_REACT_DESCRIPTION,
+        verbose=verbose,
+        agent_kwargs={
+            "memory_prompts": [MessagesPlaceholder(variable_name="chat_history")],
+            "input_variables": ["input", "agent_scratchpad", "chat_history"],
+        },
+    )
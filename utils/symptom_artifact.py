@@ -0,0 +1,165 @@
+import csv
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+from utils.file_utils import (
+    atomic_write_text, current_build_dir, file_lock, file_sha256, make_build_dir, publish_build_dir,
+)
+
+
+# -------------------
+# Paths & Config
+# -------------------
+DATA_DIR = "data"
+SYMPTOM_CSV = os.path.join(DATA_DIR, "disease_symptom.csv")
+ARTIFACT_DIR = os.path.join(DATA_DIR, ".cache", "symptom_artifact")
+ARTIFACT_VERSION = 1
+META_FILE = "meta.json"
+BITS_FILE = "bits.npy"
+DISEASE_IDS_FILE = "disease_ids.npy"
+LOCK_FILE = ".lock"
+
+
+# -------------------
+# Compiled symptom table
+# -------------------
+class SymptomArtifact:
+    """
+    Compiled form of ``disease_symptom.csv``: the symptom vocabulary, sorted
+    disease names, one disease id per row and the row x symptom 0/1 matrix
+    packed to bits. The arrays are memory-mapped read-only, so loading costs a
+    JSON read and two mmaps instead of a CSV parse.
+
+    ``artifact_dir`` is one published build (see ``utils.file_utils``); a
+    recompile writes a new build, so mapped files are never changed underneath.
+    """
+
+    def __init__(self, artifact_dir: str, meta: dict):
+        self.artifact_dir = artifact_dir
+        self.meta = meta
+        self.symptoms = meta["symptoms"]
+        self.diseases = meta["diseases"]
+        self.n_rows = meta["rows"]
+        self.bits = np.load(os.path.join(artifact_dir, BITS_FILE), mmap_mode="r")
+        self.disease_ids = np.load(os.path.join(artifact_dir, DISEASE_IDS_FILE), mmap_mode="r")
+
+    def matrix(self) -> np.ndarray:
+        """Unpacked (rows x symptoms) uint8 matrix."""
+        return np.unpackbits(self.bits, axis=1, count=len(self.symptoms))
+
+    def row_diseases(self) -> list:
+        return [self.diseases[i] for i in self.disease_ids]
+
+
+def compile_symptom_csv(csv_path: str = SYMPTOM_CSV, artifact_dir: str = ARTIFACT_DIR):
+    """
+    Parses the CSV once and publishes the artifact as a new build under
+    ``artifact_dir``. Returns (build directory, metadata). Hold the
+    ``artifact_dir`` lock while calling this (``load_symptom_artifact`` does).
+    """
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        disease_col = next((i for i, col in enumerate(header) if col.lower() == "disease"), None)
+        if disease_col is None:
+            raise ValueError(f"❌ {csv_path} has no 'Disease' column")
+        symptom_cols = [i for i in range(len(header)) if i != disease_col]
+        row_diseases, rows = [], []
+        for record in reader:
+            if not record:
+                continue
+            row_diseases.append(record[disease_col])
+            rows.append([_is_set(record[i]) for i in symptom_cols])
+
+    diseases = sorted(set(row_diseases))
+    index = {name: i for i, name in enumerate(diseases)}
+    matrix = np.asarray(rows, dtype=np.uint8).reshape(len(rows), len(symptom_cols))
+    st = os.stat(csv_path)
+    meta = {
+        "version": ARTIFACT_VERSION,
+        "csv_path": os.path.abspath(csv_path),
+        "csv_sha256": file_sha256(csv_path),
+        "csv_mtime_ns": st.st_mtime_ns,
+        "csv_size": st.st_size,
+        "rows": len(rows),
+        "symptoms": [header[i] for i in symptom_cols],
+        "diseases": diseases,
+    }
+
+    # Written to a fresh build directory and published with one pointer swap,
+    # so readers never see a partial artifact or files of two different builds
+    build_dir = make_build_dir(artifact_dir)
+    try:
+        np.save(os.path.join(build_dir, BITS_FILE), np.packbits(matrix, axis=1))
+        np.save(os.path.join(build_dir, DISEASE_IDS_FILE),
+                np.asarray([index[name] for name in row_diseases], dtype=np.int32))
+        _write_meta(build_dir, meta)
+    except BaseException:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+    publish_build_dir(artifact_dir, build_dir)
+    return build_dir, meta
+
+
+def _is_set(value: str) -> int:
+    value = value.strip()
+    return int(bool(value) and float(value) == 1)
+
+
+def _write_meta(build_dir: str, meta: dict):
+    atomic_write_text(os.path.join(build_dir, META_FILE), json.dumps(meta))
+
+
+def _read_meta(build_dir):
+    path = os.path.join(build_dir, META_FILE) if build_dir else None
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _is_current(meta, csv_path: str, build_dir: str) -> bool:
+    if not meta or meta.get("version") != ARTIFACT_VERSION:
+        return False
+    if meta.get("csv_path") != os.path.abspath(csv_path):
+        return False
+    st = os.stat(csv_path)
+    if meta.get("csv_mtime_ns") == st.st_mtime_ns and meta.get("csv_size") == st.st_size:
+        return True
+    # Touched but maybe unchanged (checkout, copy): compare content before rebuilding
+    if meta.get("csv_size") == st.st_size and meta.get("csv_sha256") == file_sha256(csv_path):
+        meta.update(csv_mtime_ns=st.st_mtime_ns)
+        _write_meta(build_dir, meta)
+        return True
+    return False
+
+
+_artifact_lock = threading.Lock()
+
+
+def load_symptom_artifact(csv_path: str = SYMPTOM_CSV, artifact_dir: str = ARTIFACT_DIR) -> SymptomArtifact:
+    """
+    Loads the compiled artifact, recompiling it first if the CSV changed.
+    Compiles are serialized across threads and processes; a process that waited
+    for the lock reuses the build another one just published.
+    """
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(f"❌ File not found: {csv_path}")
+    build_dir = current_build_dir(artifact_dir)
+    meta = _read_meta(build_dir)
+    if _is_current(meta, csv_path, build_dir):
+        return SymptomArtifact(build_dir, meta)
+    with _artifact_lock, file_lock(os.path.join(artifact_dir, LOCK_FILE)):
+        build_dir = current_build_dir(artifact_dir)
+        meta = _read_meta(build_dir)
+        if not _is_current(meta, csv_path, build_dir):
+            print(f"[INFO] Compiling {csv_path} -> {artifact_dir}")
+            build_dir, meta = compile_symptom_csv(csv_path, artifact_dir)
+        return SymptomArtifact(build_dir, meta)
@@ -1,69 +1,318 @@
 import os
+import threading
+from itertools import compress, islice
+
+import numpy as np
 import pandas as pd
 
-DATA_DIR = "data"
-SYMPTOM_CSV = os.path.join(DATA_DIR, "disease_symptom.csv")
+from utils.symptom_artifact import ARTIFACT_DIR, SYMPTOM_CSV, load_symptom_artifact
+from utils.symptom_lexicon import SymptomLexicon, canonical_symptom, get_symptom_lexicon
+from utils.symptom_model import DEFAULT_MODEL_KIND, MODEL_DIR, load_symptom_model
+from utils.telemetry import span
+
+# Weights of the blended match score
+W_JACCARD = 0.4
+W_COVERAGE = 0.4
+W_PRECISION = 0.2
+
+# Symptom sets scored per matrix product in batch mode
+BATCH_CHUNK_SIZE = 1024
+
+# "heuristic" ranks by the blended match score, "model" by a trained classifier (utils.symptom_model)
+SYMPTOM_MODES = ("heuristic", "model")
+SYMPTOM_MODE = os.getenv("MEDBOT_SYMPTOM_MODE", "heuristic")
 
 
 def normalize(text: str) -> str:
-    return text.strip().lower().replace(" ", "_")
+    return canonical_symptom(text)
+
+
+def parse_symptoms(symptom_string: str, lexicon: SymptomLexicon = None) -> set:
+    """Canonical symptom ids of a comma-separated string (synonyms and typos resolved)."""
+    return (lexicon or get_symptom_lexicon()).resolve(sym for sym in symptom_string.split(",") if sym.strip())
 
 
 class SymptomChecker:
-    def __init__(self):
-        if not os.path.exists(SYMPTOM_CSV):
-            raise FileNotFoundError(f"❌ File not found: {SYMPTOM_CSV}")
-        self.df = pd.read_csv(SYMPTOM_CSV)
-
-        self.symptom_cols = [col for col in self.df.columns if col.lower() != "disease"]
-        self.df["symptom_tokens"] = self.df[self.symptom_cols].apply(
-            lambda row: set(col for col in self.symptom_cols if row[col] == 1),
-            axis=1
-        )
-        self.df["Disease"] = self.df["Disease"].astype(str)
+    """
+    Scores diseases against a set of symptoms.
+
+    The CSV is compiled once into a bit-packed artifact (see
+    ``utils.symptom_artifact``) and held as a dense uint8 matrix (rows x
+    symptoms) so that every row is scored in one vectorized pass. Rows are grouped by disease once at
+    load time, which lets ``predict`` take the best row per disease with a
+    single ``reduceat`` instead of sorting and de-duplicating a DataFrame.
+
+    With ``mode="model"`` diseases are ranked by the probabilities of a small
+    classifier trained on the same matrix instead. It is loaded on first use;
+    ``get_checker`` loads it up front when that is the default mode.
+
+    All precomputed arrays are read-only and nothing on the instance is written
+    after ``__init__`` apart from that one-time model load: scores live in
+    per-call local arrays and every result is a freshly built DataFrame. One
+    instance can therefore serve many threads in parallel without locking.
+    """
+
+    def __init__(self, csv_path: str = SYMPTOM_CSV, artifact_dir: str = ARTIFACT_DIR,
+                 model_dir: str = MODEL_DIR, model_kind: str = DEFAULT_MODEL_KIND):
+        artifact = load_symptom_artifact(csv_path, artifact_dir)
+        self.csv_sha256 = artifact.meta["csv_sha256"]
+        self.model_dir = model_dir
+        self.model_kind = model_kind
+        self.lexicon = SymptomLexicon(artifact.symptoms)
+        self.symptom_cols = list(self.lexicon.symptoms)
+        self.columns = ["Disease", *self.symptom_cols, "symptom_tokens"]
+
+        # Disease-symptom matrix over canonical symptoms; headers that share one
+        # (e.g. "fluid_overload" and "fluid_overload.1") are OR-merged
+        raw = artifact.matrix()
+        self.symptom_index = {col: j for j, col in enumerate(self.symptom_cols)}
+        self.matrix = np.zeros((raw.shape[0], len(self.symptom_cols)), dtype=np.uint8)
+        for i, symptom_id in enumerate(self.lexicon.column_ids):
+            self.matrix[:, self.symptom_index[symptom_id]] |= raw[:, i]
+        self.row_sizes = self.matrix.sum(axis=1, dtype=np.int64)
+        self._matrix_f32 = self.matrix.astype(np.float32)
+
+        # Rows grouped by disease (stable, so row order is kept within a group)
+        self.disease_names = np.array(artifact.diseases, dtype=object)
+        self.disease_ids = np.asarray(artifact.disease_ids, dtype=np.int64)
+        self._group_order = np.argsort(self.disease_ids, kind="stable")
+        grouped_ids = self.disease_ids[self._group_order]
+        self._group_starts = np.flatnonzero(np.r_[True, grouped_ids[1:] != grouped_ids[:-1]])
+        self._group_sizes = np.diff(np.r_[self._group_starts, len(grouped_ids)])
+
+        # Per disease: first row in CSV order and the union of its rows' symptoms (model mode)
+        self._disease_rows = self._group_order[self._group_starts]
+        self._disease_profiles = np.maximum.reduceat(self.matrix[self._group_order], self._group_starts)
+
+        # Per-row data used to build result frames
+        self._row_tokens = tuple(frozenset(compress(self.symptom_cols, row)) for row in self.matrix)
+        self._row_diseases = tuple(artifact.row_diseases())
+        self._df = None
+        self._model = None
+        self._model_lock = threading.Lock()
+
+        for arr in (self.matrix, self.row_sizes, self._matrix_f32, self.disease_names, self.disease_ids,
+                    self._group_order, self._group_starts, self._group_sizes, self._disease_rows,
+                    self._disease_profiles):
+            arr.setflags(write=False)
+
+    @property
+    def df(self) -> pd.DataFrame:
+        """The full table as a DataFrame, built on first use only."""
+        if self._df is None:
+            self._df = self._result_frame(np.arange(len(self._row_diseases)), None).reset_index(drop=True)
+        return self._df
+
+    def model(self):
+        """The trained ``model_kind`` classifier of this table (see ``utils.symptom_model``)."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    with span("symptom.model_load"):
+                        self._model = load_symptom_model(self, self.model_kind, self.model_dir)
+        return self._model
+
+    def _user_matrix(self, token_sets) -> np.ndarray:
+        user_matrix = np.zeros((len(token_sets), len(self.symptom_cols)), dtype=np.float32)
+        for i, tokens in enumerate(token_sets):
+            user_matrix[i, [self.symptom_index[tok] for tok in tokens if tok in self.symptom_index]] = 1
+        return user_matrix
+
+    def _rank_diseases(self, probs: np.ndarray):
+        """Disease order for a probability vector or matrix: by probability, then by first row."""
+        rows = np.broadcast_to(self._disease_rows, probs.shape)
+        return np.lexsort((rows, -probs), axis=-1)
+
+    def score_rows(self, user_tokens: set) -> np.ndarray:
+        """Blended match score of every CSV row for the given normalized symptoms."""
+        cols = [self.symptom_index[tok] for tok in user_tokens if tok in self.symptom_index]
+        intersection = self.matrix[:, cols].sum(axis=1, dtype=np.int64)
+        return self._blend(intersection, len(user_tokens))
+
+    def _blend(self, intersection: np.ndarray, n_user) -> np.ndarray:
+        union = self.row_sizes + n_user - intersection
+        jaccard = intersection / union
+        coverage = intersection / n_user
+        precision = np.divide(intersection, self.row_sizes, out=np.zeros(intersection.shape),
+                              where=self.row_sizes > 0)
+        return W_JACCARD * jaccard + W_COVERAGE * coverage + W_PRECISION * precision
 
-    def predict(self, symptom_string: str, top_n: int = 5, min_score: float = 0.0) -> pd.DataFrame:
-        user_tokens = set(normalize(sym) for sym in symptom_string.split(",") if sym)
+    def _disease_max(self, scores: np.ndarray):
+        """
+        Best score per disease and the first row (in CSV order) reaching it.
+        Works on a single score vector or on a (cases x rows) score matrix.
+        """
+        grouped = scores[..., self._group_order]
+        disease_max = np.maximum.reduceat(grouped, self._group_starts, axis=-1)
+        at_max = grouped == np.repeat(disease_max, self._group_sizes, axis=-1)
+        candidates = np.where(at_max, self._group_order, scores.shape[-1])
+        rep_rows = np.minimum.reduceat(candidates, self._group_starts, axis=-1)
+        return disease_max, rep_rows
+
+    def best_rows(self, scores: np.ndarray, top_n: int, min_score: float):
+        """
+        Picks the highest-scoring row of each disease and returns the top ``top_n``
+        (row indices, scores), ordered by score and then by row position.
+        """
+        disease_max, rep_rows = self._disease_max(scores)
+
+        keep = np.flatnonzero(disease_max >= min_score)
+        if top_n <= 0 or not len(keep):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        if top_n < len(keep):
+            # Every disease scoring at least the n-th best survives, so ties at the cut are kept
+            kth = -np.partition(-disease_max[keep], top_n - 1)[top_n - 1]
+            keep = keep[disease_max[keep] >= kth]
+
+        order = np.lexsort((rep_rows[keep], -disease_max[keep]))[:top_n]
+        chosen = keep[order]
+        return rep_rows[chosen], disease_max[chosen]
+
+    def predict_batch(self, symptom_sets, top_n: int = 5, min_score: float = 0.0,
+                      chunk_size: int = BATCH_CHUNK_SIZE, mode: str = "heuristic"):
+        """
+        Scores many symptom sets at once and yields, for each input in order, a list
+        of ``(disease, score)`` pairs ranked exactly like ``predict``.
+
+        Each item may be a comma-separated string or an iterable of symptom names.
+        Inputs are consumed lazily in chunks of ``chunk_size``, so memory is bounded
+        by ``chunk_size x rows`` regardless of how many sets are streamed through.
+        With ``mode="model"`` the scores are the classifier's probabilities.
+        """
+        _check_mode(mode)
+        predict_chunk = self._predict_chunk_model if mode == "model" else self._predict_chunk
+        symptom_sets = iter(symptom_sets)
+        while True:
+            chunk = list(islice(symptom_sets, chunk_size))
+            if not chunk:
+                return
+            yield from predict_chunk(chunk, top_n, min_score)
+
+    def _token_sets(self, chunk) -> list:
+        return [parse_symptoms(item, self.lexicon) if isinstance(item, str)
+                else self.lexicon.resolve(sym for sym in item if sym) for item in chunk]
+
+    def _predict_chunk(self, chunk, top_n: int, min_score: float):
+        token_sets = self._token_sets(chunk)
+        user_matrix = self._user_matrix(token_sets)
+        n_user = np.array([[len(tokens)] for tokens in token_sets], dtype=np.float64)
+
+        # Overlap counts for every (case, row) pair; exact in float32 for these sizes
+        intersection = (user_matrix @ self._matrix_f32.T).astype(np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scores = self._blend(intersection, n_user)
+        disease_max, rep_rows = self._disease_max(scores)
+        ranking = np.lexsort((rep_rows, -disease_max), axis=-1)[:, :max(top_n, 0)]
+
+        for i, tokens in enumerate(token_sets):
+            if not tokens:
+                yield []
+                continue
+            best = disease_max[i]
+            yield [(self._row_diseases[rep_rows[i, d]], float(best[d]))
+                   for d in ranking[i] if best[d] >= min_score]
+
+    def _predict_chunk_model(self, chunk, top_n: int, min_score: float):
+        token_sets = self._token_sets(chunk)
+        probs = self.model().predict_proba(self._user_matrix(token_sets))
+        ranking = self._rank_diseases(probs)[:, :max(top_n, 0)]
+
+        for i, tokens in enumerate(token_sets):
+            if not tokens:
+                yield []
+                continue
+            yield [(self.disease_names[d], float(probs[i, d])) for d in ranking[i] if probs[i, d] >= min_score]
+
+    def predict(self, symptom_string: str, top_n: int = 5, min_score: float = 0.0,
+                mode: str = "heuristic") -> pd.DataFrame:
+        _check_mode(mode)
+        user_tokens = parse_symptoms(symptom_string, self.lexicon)
         if not user_tokens:
-            return pd.DataFrame(columns=self.df.columns)
-
-        def compute_score(disease_tokens):
-            intersection = user_tokens & disease_tokens
-            union = user_tokens | disease_tokens
-            jaccard = len(intersection) / len(union) if union else 0
-            coverage = len(intersection) / len(user_tokens) if user_tokens else 0
-            precision = len(intersection) / len(disease_tokens) if disease_tokens else 0
-            return 0.4 * jaccard + 0.4 * coverage + 0.2 * precision
-
-        self.df["score"] = self.df["symptom_tokens"].apply(compute_score)
-        filtered = self.df[self.df["score"] >= min_score]
-        
-        # Sort by score and get unique diseases (keep the highest score for each disease)
-        sorted_df = filtered.sort_values("score", ascending=False)
-        unique_diseases = sorted_df.drop_duplicates(subset=["Disease"], keep="first")
-        
-        return unique_diseases.head(top_n)
+            return pd.DataFrame(columns=self.columns + ["score"])
+
+        if mode == "model":
+            return self._predict_model(user_tokens, top_n, min_score)
+        rows, scores = self.best_rows(self.score_rows(user_tokens), top_n, min_score)
+        return self._result_frame(rows, scores)
+
+    def _predict_model(self, user_tokens: set, top_n: int, min_score: float) -> pd.DataFrame:
+        """
+        One row per disease, as in heuristic mode, with the disease's probability
+        as score. Symptom columns hold the union of the disease's CSV rows and the
+        index is its first row.
+        """
+        probs = self.model().predict_proba(self._user_matrix([user_tokens])[0])
+        diseases = [d for d in self._rank_diseases(probs)[:max(top_n, 0)] if probs[d] >= min_score]
+        rows = self._disease_rows[diseases]
+        profiles = self._disease_profiles[diseases]
+        frame = pd.DataFrame(profiles.astype(np.int64), columns=self.symptom_cols, index=rows)
+        frame.insert(0, "Disease", self.disease_names[diseases].tolist())
+        frame["symptom_tokens"] = [frozenset(compress(self.symptom_cols, p)) for p in profiles]
+        frame["score"] = probs[diseases].astype(np.float64)
+        return frame[self.columns + ["score"]]
+
+    def _result_frame(self, rows: np.ndarray, scores) -> pd.DataFrame:
+        # Row positions double as index labels, as in a frame read straight from the CSV
+        frame = pd.DataFrame(self.matrix[rows].astype(np.int64), columns=self.symptom_cols, index=rows)
+        frame.insert(0, "Disease", [self._row_diseases[r] for r in rows])
+        frame["symptom_tokens"] = [self._row_tokens[r] for r in rows]
+        if scores is None:
+            return frame[self.columns]
+        frame["score"] = scores
+        return frame[self.columns + ["score"]]
+
+
+def _check_mode(mode: str):
+    if mode not in SYMPTOM_MODES:
+        raise ValueError(f"Unknown symptom mode '{mode}'. Use one of: {', '.join(SYMPTOM_MODES)}")
 
 
 _checker = None
+_checker_lock = threading.Lock()
 
 
-def predict_diseases(symptom_string: str, top_n: int = 5, min_score: float = 0.0) -> pd.DataFrame:
+def get_checker() -> SymptomChecker:
     global _checker
     if _checker is None:
-        _checker = SymptomChecker()
-    return _checker.predict(symptom_string, top_n, min_score)
+        with _checker_lock:
+            if _checker is None:
+                with span("symptom.load"):
+                    checker = SymptomChecker()
+                    if SYMPTOM_MODE == "model":
+                        checker.model()
+                    _checker = checker
+    return _checker
+
+
+def predict_diseases(symptom_string: str, top_n: int = 5, min_score: float = 0.0,
+                     mode: str = None) -> pd.DataFrame:
+    checker = get_checker()
+    with span("symptom.predict"):
+        return checker.predict(symptom_string, top_n, min_score, mode or SYMPTOM_MODE)
+
+
+def predict_diseases_batch(symptom_sets, top_n: int = 5, min_score: float = 0.0,
+                           chunk_size: int = BATCH_CHUNK_SIZE, mode: str = None):
+    return get_checker().predict_batch(symptom_sets, top_n, min_score, chunk_size, mode or SYMPTOM_MODE)
 
 
-def format_symptom_response(symptom_string: str, results_df: pd.DataFrame) -> str:
+def format_symptom_response(symptom_string: str, results_df: pd.DataFrame, mode: str = None) -> str:
+    """
+    Markdown reply for a ``predict`` frame of the given mode (default
+    ``SYMPTOM_MODE``). Heuristic scores are match scores, where 1.0 is an exact
+    match; model scores are disease probabilities.
+    """
+    mode = mode or SYMPTOM_MODE
+    _check_mode(mode)
     if results_df.empty:
         return "❌ No matches found."
 
-    user_tokens = set(normalize(sym) for sym in symptom_string.split(",") if sym)
+    user_tokens = parse_symptoms(symptom_string)
+    heuristic = mode == "heuristic"
 
     # Show all exact matches if they exist, otherwise show top 3 unique diseases
     exact_matches = results_df[results_df["score"] == 1.0]
-    if not exact_matches.empty:
+    if heuristic and not exact_matches.empty:
         results_df = exact_matches
     else:
         # Ensure we get exactly 3 unique diseases for top 3
@@ -82,12 +331,13 @@ def format_symptom_response(symptom_string: str, results_df: pd.DataFrame) -> st
         matched = user_tokens & row["symptom_tokens"]
 
         # Skip if no symptoms matched (for non-exact matches)
-        if score < 1.0 and len(matched) < 1:
+        if heuristic and score < 1.0 and len(matched) < 1:
             continue
 
+        label = "Match Score" if heuristic else "Probability"
         output.append(
             f"#### 🩺 {disease}\n"
-            f"**Match Score:** {int(score * 100)}%"
+            f"**{label}:** {int(score * 100)}%"
         )
 
-    return "\n\n---\n\n".join(output) if output else "❌ No matches found."
\ No newline at end of file
+    return "\n\n---\n\n".join(output) if output else "❌ No matches found."
@@ -0,0 +1,176 @@
+import difflib
+import re
+import threading
+from functools import lru_cache
+
+
+# -------------------
+# Config
+# -------------------
+FUZZY_CUTOFF = 0.85
+TRIGRAM_MIN_OVERLAP = 0.3
+TRIGRAM_CANDIDATES = 8
+LOOKUP_CACHE_SIZE = 65536
+
+# Lay terms -> canonical symptom ids
+SYMPTOM_SYNONYMS = {
+    "fever": "high_fever",
+    "temperature": "high_fever",
+    "rash": "skin_rash",
+    "itchy": "itching",
+    "itchy skin": "itching",
+    "sneezing": "continuous_sneezing",
+    "tired": "fatigue",
+    "tiredness": "fatigue",
+    "exhaustion": "fatigue",
+    "shortness of breath": "breathlessness",
+    "short of breath": "breathlessness",
+    "diarrhea": "diarrhoea",
+    "stomach ache": "stomach_pain",
+    "stomachache": "stomach_pain",
+    "tummy ache": "stomach_pain",
+    "belly ache": "belly_pain",
+    "throwing up": "vomiting",
+    "vomit": "vomiting",
+    "feeling sick": "nausea",
+    "nauseous": "nausea",
+    "dizzy": "dizziness",
+    "sore throat": "throat_irritation",
+    "stuffy nose": "congestion",
+    "blocked nose": "congestion",
+    "jaundice": "yellowish_skin",
+    "painful urination": "burning_micturition",
+    "burning urination": "burning_micturition",
+    "frequent urination": "polyuria",
+    "backache": "back_pain",
+    "back ache": "back_pain",
+    "head ache": "headache",
+    "sweats": "sweating",
+    "night sweats": "sweating",
+    "anxious": "anxiety",
+    "depressed": "depression",
+    "blurred vision": "blurred_and_distorted_vision",
+    "blurry vision": "blurred_and_distorted_vision",
+    "neck stiffness": "stiff_neck",
+    "joint ache": "joint_pain",
+    "muscle ache": "muscle_pain",
+    "body ache": "muscle_pain",
+    "loss of weight": "weight_loss",
+    "heart racing": "fast_heart_rate",
+    "racing heart": "fast_heart_rate",
+    "cold hands and feet": "cold_hands_and_feets",
+    "swollen extremities": "swollen_extremeties",
+    "typhos": "toxic_look_typhos",
+}
+
+_DUPLICATE_SUFFIX_RE = re.compile(r"\.\d+$")  # pandas-style "fluid_overload.1"
+
+
+def canonical_symptom(text: str) -> str:
+    """
+    Canonical symptom id: lowercase, duplicate-column suffix dropped and every run
+    of non-alphanumerics collapsed to one underscore ("dischromic _patches" ->
+    "dischromic_patches", "toxic_look_(typhos)" -> "toxic_look_typhos").
+    """
+    text = _DUPLICATE_SUFFIX_RE.sub("", text.strip().lower())
+    return re.sub(r"[^a-z0-9]+", "_", text).strip("_")
+
+
+def trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# -------------------
+# Lookup index
+# -------------------
+class SymptomLexicon:
+    """
+    Maps free-text symptom phrases to canonical symptom ids.
+
+    Built once from the CSV headers: every header gets a canonical id (several
+    headers may share one), and canonical ids, raw headers and synonyms are all
+    lookup keys. A phrase is resolved by exact key first, then by typo
+    matching: a trigram inverted index proposes the few keys sharing the most
+    trigrams and difflib confirms the best one. Results are memoized, so
+    repeated phrases cost a dict lookup.
+    """
+
+    def __init__(self, columns, synonyms=None, cutoff: float = FUZZY_CUTOFF):
+        self.columns = list(columns)
+        self.column_ids = [canonical_symptom(col) for col in self.columns]
+        self.symptoms = list(dict.fromkeys(self.column_ids))  # CSV order, duplicates merged
+        self.cutoff = cutoff
+
+        known = set(self.symptoms)
+        self.keys = {}
+        for col, symptom_id in zip(self.columns, self.column_ids):
+            self.keys[symptom_id] = symptom_id
+            # Raw header forms, e.g. "spotting__urination" as produced by plain normalization
+            self.keys.setdefault(col.strip().lower().replace(" ", "_"), symptom_id)
+        for term, symptom_id in (SYMPTOM_SYNONYMS if synonyms is None else synonyms).items():
+            symptom_id = canonical_symptom(symptom_id)
+            if symptom_id in known:
+                self.keys.setdefault(canonical_symptom(term), symptom_id)
+
+        self._key_list = list(self.keys)
+        self._key_trigrams = [trigrams(key) for key in self._key_list]
+        self._trigram_index = {}
+        for i, grams in enumerate(self._key_trigrams):
+            for gram in grams:
+                self._trigram_index.setdefault(gram, []).append(i)
+        self.lookup = lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._lookup)
+
+    def _lookup(self, phrase: str):
+        """Canonical id for a phrase, or None if nothing is close enough."""
+        key = canonical_symptom(phrase)
+        if not key:
+            return None
+        if key in self.keys:
+            return self.keys[key]
+        return self._fuzzy(key)
+
+    def _fuzzy(self, key: str):
+        grams = trigrams(key)
+        overlap = {}
+        for gram in grams:
+            for i in self._trigram_index.get(gram, ()):
+                overlap[i] = overlap.get(i, 0) + 1
+        candidates = []
+        for i, shared in overlap.items():
+            score = shared / (len(grams) + len(self._key_trigrams[i]) - shared)
+            if score >= TRIGRAM_MIN_OVERLAP:
+                candidates.append((score, i))
+        best, best_ratio = None, self.cutoff
+        for _, i in sorted(candidates, reverse=True)[:TRIGRAM_CANDIDATES]:
+            ratio = difflib.SequenceMatcher(None, key, self._key_list[i]).ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = self._key_list[i], ratio
+        return self.keys[best] if best is not None else None
+
+    def resolve(self, phrases) -> set:
+        """
+        Canonical ids for an iterable of phrases. Unknown phrases are kept in
+        canonical form, so they still count as (unmatched) user symptoms.
+        """
+        resolved = set()
+        for phrase in phrases:
+            symptom_id = self.lookup(phrase)
+            resolved.add(symptom_id if symptom_id is not None else canonical_symptom(phrase))
+        resolved.discard("")
+        return resolved
+
+
+_lexicon = None
+_lexicon_lock = threading.Lock()
+
+
+def get_symptom_lexicon() -> SymptomLexicon:
+    global _lexicon
+    if _lexicon is None:
+        with _lexicon_lock:
+            if _lexicon is None:
+                from utils.symptom_artifact import load_symptom_artifact
+
+                _lexicon = SymptomLexicon(load_symptom_artifact().symptoms)
+    return _lexicon
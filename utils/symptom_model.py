@@ -0,0 +1,191 @@
+import json
+import os
+import tempfile
+import threading
+
+import numpy as np
+
+from utils.file_utils import file_lock
+
+
+# -------------------
+# Paths & Config
+# -------------------
+MODEL_DIR = os.path.join("data", ".cache", "symptom_model")
+MODEL_KINDS = ("nb", "logreg")
+DEFAULT_MODEL_KIND = os.getenv("MEDBOT_SYMPTOM_MODEL", "logreg")
+MODEL_VERSION = 1
+LOCK_FILE = ".lock"
+
+# Training on random symptom subsets of each row: users report a few symptoms, not a full profile
+AUGMENT_SAMPLES = 30
+AUGMENT_KEEP = 0.5
+NB_ALPHA = 1.0
+LOGREG_EPOCHS = 300
+LOGREG_LR = 0.1
+LOGREG_L2 = 1e-4
+
+
+# -------------------
+# Model
+# -------------------
+class SymptomModel:
+    """
+    Linear disease classifier over the binary symptom vector:
+    ``P(disease | x) = softmax(x @ weights + bias)``. Bernoulli naive Bayes and
+    multinomial logistic regression both reduce to this form, so inference is
+    one matrix product for a whole batch.
+    """
+
+    def __init__(self, kind: str, weights: np.ndarray, bias: np.ndarray, symptoms: list, diseases: list,
+                 meta: dict = None):
+        self.kind = kind
+        self.weights = np.asarray(weights, dtype=np.float32)
+        self.bias = np.asarray(bias, dtype=np.float32)
+        self.symptoms = list(symptoms)
+        self.diseases = list(diseases)
+        self.meta = meta or {}
+
+    def predict_proba(self, x: np.ndarray) -> np.ndarray:
+        """Class probabilities for a (symptoms,) vector or a (cases x symptoms) matrix."""
+        logits = np.asarray(x, dtype=np.float32) @ self.weights + self.bias
+        logits -= logits.max(axis=-1, keepdims=True)
+        probs = np.exp(logits)
+        return probs / probs.sum(axis=-1, keepdims=True)
+
+    def save(self, path: str):
+        """Writes through a unique temp file and a rename, so readers never load a partial file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=".tmp-", suffix=".npz")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez_compressed(
+                    f, weights=self.weights, bias=self.bias,
+                    header=np.array(json.dumps({"kind": self.kind, "symptoms": self.symptoms,
+                                                "diseases": self.diseases, "meta": self.meta})),
+                )
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str) -> "SymptomModel":
+        with np.load(path) as data:
+            header = json.loads(str(data["header"]))
+            return cls(header["kind"], data["weights"], data["bias"], header["symptoms"],
+                       header["diseases"], header["meta"])
+
+
+# -------------------
+# Training
+# -------------------
+def augment(matrix: np.ndarray, labels: np.ndarray, samples: int = AUGMENT_SAMPLES,
+            keep: float = AUGMENT_KEEP, seed: int = 0):
+    """Each full row plus ``samples`` random subsets of its symptoms (at least one kept)."""
+    rng = np.random.default_rng(seed)
+    rows = np.repeat(matrix, samples, axis=0)
+    mask = rng.random(rows.shape) < keep
+    subsets = rows & mask
+    # Rows that lost every symptom keep one at random
+    empty = np.flatnonzero((subsets.sum(axis=1) == 0) & (rows.sum(axis=1) > 0))
+    for i in empty:
+        subsets[i, rng.choice(np.flatnonzero(rows[i]))] = 1
+    x = np.concatenate([matrix, subsets]).astype(np.float32)
+    y = np.concatenate([labels, np.repeat(labels, samples)])
+    return x, y
+
+
+def train_naive_bayes(x: np.ndarray, y: np.ndarray, n_classes: int, alpha: float = NB_ALPHA):
+    counts = np.bincount(y, minlength=n_classes).astype(np.float64)
+    onehot = np.eye(n_classes)[y]
+    feature_counts = onehot.T @ x  # classes x symptoms
+    p = (feature_counts + alpha) / (counts[:, None] + 2 * alpha)
+    log_p, log_not_p = np.log(p), np.log1p(-p)
+    weights = (log_p - log_not_p).T
+    bias = np.log(counts / counts.sum()) + log_not_p.sum(axis=1)
+    return weights, bias
+
+
+def train_logreg(x: np.ndarray, y: np.ndarray, n_classes: int, epochs: int = LOGREG_EPOCHS,
+                 lr: float = LOGREG_LR, l2: float = LOGREG_L2):
+    """Softmax regression, full-batch Adam; the data is a few thousand rows."""
+    n, d = x.shape
+    onehot = np.eye(n_classes, dtype=np.float32)[y]
+    weights = np.zeros((d, n_classes), dtype=np.float32)
+    bias = np.zeros(n_classes, dtype=np.float32)
+    params = [weights, bias]
+    m = [np.zeros_like(p) for p in params]
+    v = [np.zeros_like(p) for p in params]
+    beta1, beta2, eps = 0.9, 0.999, 1e-8
+    for t in range(1, epochs + 1):
+        logits = x @ weights + bias
+        logits -= logits.max(axis=1, keepdims=True)
+        probs = np.exp(logits)
+        probs /= probs.sum(axis=1, keepdims=True)
+        error = (probs - onehot) / n
+        grads = [x.T @ error + l2 * weights, error.sum(axis=0)]
+        for p, g, m_i, v_i in zip(params, grads, m, v):
+            m_i *= beta1
+            m_i += (1 - beta1) * g
+            v_i *= beta2
+            v_i += (1 - beta2) * g * g
+            p -= lr * (m_i / (1 - beta1 ** t)) / (np.sqrt(v_i / (1 - beta2 ** t)) + eps)
+    return weights, bias
+
+
+def train_symptom_model(matrix: np.ndarray, disease_ids: np.ndarray, symptoms: list, diseases: list,
+                        kind: str = DEFAULT_MODEL_KIND, seed: int = 0, meta: dict = None) -> SymptomModel:
+    if kind not in MODEL_KINDS:
+        raise ValueError(f"Unknown model kind '{kind}'. Use one of: {', '.join(MODEL_KINDS)}")
+    x, y = augment(np.asarray(matrix, dtype=np.uint8), np.asarray(disease_ids), seed=seed)
+    if kind == "nb":
+        weights, bias = train_naive_bayes(x, y, len(diseases))
+    else:
+        weights, bias = train_logreg(x, y, len(diseases))
+    return SymptomModel(kind, weights, bias, symptoms, diseases, meta)
+
+
+_model_lock = threading.Lock()
+
+
+def _saved_model(path: str, checker, meta: dict):
+    """The model saved at ``path`` if it was trained on ``checker``'s table, else None."""
+    if not os.path.exists(path):
+        return None
+    try:
+        model = SymptomModel.load(path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[WARN] Ignoring unreadable symptom model {path}: {e}")
+        return None
+    if (model.meta == meta and model.symptoms == checker.symptom_cols
+            and model.diseases == list(checker.disease_names)):
+        return model
+    return None
+
+
+def load_symptom_model(checker, kind: str = DEFAULT_MODEL_KIND, model_dir: str = MODEL_DIR,
+                       retrain: bool = False) -> SymptomModel:
+    """
+    The model for ``checker``'s symptom table. A saved model is reused while the
+    CSV hash and symptom/disease lists match; otherwise it is trained and saved.
+    Training is serialized across threads and processes, and a process that
+    waited for the lock reuses the model another one just saved. Run
+    ``train_symptom_model.py`` or warm the checker at startup so this never
+    trains inside a request.
+    """
+    meta = {"version": MODEL_VERSION, "csv_sha256": checker.csv_sha256}
+    path = os.path.join(model_dir, f"{kind}.npz")
+    model = None if retrain else _saved_model(path, checker, meta)
+    if model is not None:
+        return model
+    with _model_lock, file_lock(os.path.join(model_dir, LOCK_FILE)):
+        model = None if retrain else _saved_model(path, checker, meta)
+        if model is None:
+            print(f"[INFO] Training {kind} symptom model -> {path}")
+            model = train_symptom_model(checker.matrix, checker.disease_ids, checker.symptom_cols,
+                                        list(checker.disease_names), kind, meta=meta)
+            model.save(path)
+        return model
@@ -0,0 +1,107 @@
+import re
+import threading
+
+from utils.symptom_lexicon import SymptomLexicon, canonical_symptom, get_symptom_lexicon
+from utils.telemetry import incr, span
+
+
+# -------------------
+# Config
+# -------------------
+MAX_WORDS_PER_SYMPTOM = 6
+# A ReAct turn needs at least one call to pick the tool and one to phrase the answer
+LLM_CALLS_PER_AGENT_TURN = 2
+
+_PREFIX_RE = re.compile(
+    r"^\s*(?:(?:i\s+(?:have|am having|'ve got|have got|got|feel|am feeling)|i'm\s+(?:having|feeling)|"
+    r"my\s+symptoms\s+are|symptoms?)\s*:?\s+)",
+    re.IGNORECASE,
+)
+_ARTICLE_RE = re.compile(r"^(?:a|an|some)\s+", re.IGNORECASE)
+_SPLIT_RE = re.compile(r"[,;\n]+")
+_AND_RE = re.compile(r"\s+(?:and|&|\+)\s+", re.IGNORECASE)
+
+
+# -------------------
+# Router
+# -------------------
+class SymptomRouter:
+    """
+    Deterministic fast path in front of the symptom agent.
+
+    Input made only of symptoms ("fever, cough, headache", "I have itching and
+    a skin rash") is resolved through the symptom lexicon (canonical names,
+    synonyms, typo matching) and answered straight from ``predict_diseases``.
+    Anything else (questions, free-form sentences, unknown terms) returns
+    None and goes to the LLM agent.
+    """
+
+    def __init__(self, lexicon: SymptomLexicon = None):
+        self.lexicon = lexicon or get_symptom_lexicon()
+        self.counters = {"fast_path": 0, "llm": 0, "llm_calls_avoided": 0}
+        self._lock = threading.Lock()
+
+    def match_one(self, phrase: str):
+        phrase = _ARTICLE_RE.sub("", phrase.strip())
+        if canonical_symptom(phrase).count("_") >= MAX_WORDS_PER_SYMPTOM:
+            return None
+        return self.lexicon.lookup(phrase)
+
+    def match(self, text: str):
+        """Canonical symptom ids for symptom-only input, or None if any part is not a symptom."""
+        if not text or "?" in text:
+            return None
+        text = _PREFIX_RE.sub("", text.strip().rstrip(".!"))
+        symptoms = []
+        for piece in _SPLIT_RE.split(text):
+            piece = piece.strip()
+            if not piece:
+                continue
+            col = self.match_one(piece)
+            if col is not None:
+                symptoms.append(col)
+                continue
+            # "cough and headache"; whole-piece matching first keeps "cold_hands_and_feets" intact
+            parts = [self.match_one(part) for part in _AND_RE.split(_ARTICLE_RE.sub("", piece))]
+            if len(parts) < 2 or None in parts:
+                return None
+            symptoms.extend(parts)
+        return list(dict.fromkeys(symptoms)) or None
+
+    def route(self, text: str):
+        """The tool's answer for symptom-only input, else None (use the LLM)."""
+        with span("router.match"):
+            symptoms = self.match(text)
+        with self._lock:
+            if symptoms is None:
+                self.counters["llm"] += 1
+            else:
+                self.counters["fast_path"] += 1
+                self.counters["llm_calls_avoided"] += LLM_CALLS_PER_AGENT_TURN
+        if symptoms is None:
+            incr("agent_routes_total", route="llm")
+            return None
+        incr("agent_routes_total", route="fast_path")
+        incr("agent_llm_calls_avoided_total", LLM_CALLS_PER_AGENT_TURN)
+
+        from utils.symptom_checker import predict_diseases, format_symptom_response
+
+        symptom_string = ", ".join(symptoms)
+        return format_symptom_response(symptom_string, predict_diseases(symptom_string, top_n=3))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counters)
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_symptom_router() -> SymptomRouter:
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = SymptomRouter()
+    return _router
@@ -0,0 +1,232 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+
+# -------------------
+# Config
+# -------------------
+TRACE_LOG_PATH = os.getenv("MEDBOT_TRACE_LOG")  # JSONL file of finished request traces
+METRIC_PREFIX = "medbot_"
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for usage counters."""
+    return (len(text) + 3) // 4
+
+
+# -------------------
+# Memory
+# -------------------
+def memory_snapshot() -> dict:
+    """Current and peak resident memory of this process in MB."""
+    snapshot = {}
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith(("VmRSS:", "VmHWM:")):
+                    key = "rss_mb" if line.startswith("VmRSS") else "peak_rss_mb"
+                    snapshot[key] = int(line.split()[1]) / 1024
+    except OSError:
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        snapshot["peak_rss_mb"] = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return snapshot
+
+
+# -------------------
+# Metrics registry
+# -------------------
+class MetricsRegistry:
+    """Thread-safe counters and duration histograms with Prometheus text export."""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def incr(self, name: str, value: float = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            hist = self._histograms.get(stage)
+            if hist is None:
+                hist = self._histograms[stage] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    hist["counts"][i] += 1
+            hist["sum"] += seconds
+            hist["count"] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = {_series(name, labels): value for (name, labels), value in self._counters.items()}
+            stages = {
+                stage: {"count": h["count"], "mean_ms": h["sum"] / h["count"] * 1000 if h["count"] else 0.0}
+                for stage, h in self._histograms.items()
+            }
+        return {"counters": counters, "stages": stages, "memory": memory_snapshot()}
+
+    def prometheus_text(self) -> str:
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((stage, dict(h, counts=list(h["counts"]))) for stage, h in self._histograms.items())
+        seen = set()
+        for (name, labels), value in counters:
+            metric = METRIC_PREFIX + name
+            if metric not in seen:
+                lines.append(f"# TYPE {metric} counter")
+                seen.add(metric)
+            lines.append(f"{_series(metric, labels)} {value}")
+
+        metric = METRIC_PREFIX + "stage_duration_seconds"
+        if histograms:
+            lines.append(f"# TYPE {metric} histogram")
+        for stage, hist in histograms:
+            for bound, count in zip(self.buckets, hist["counts"]):
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {hist["count"]}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {hist["sum"]}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {hist["count"]}')
+
+        memory = memory_snapshot()
+        for key, name in (("rss_mb", "resident_memory_bytes"), ("peak_rss_mb", "peak_resident_memory_bytes")):
+            if key in memory:
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} gauge")
+                lines.append(f"{METRIC_PREFIX}{name} {int(memory[key] * 1024 * 1024)}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+def _series(name: str, labels) -> str:
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+
+registry = MetricsRegistry()
+
+
+# -------------------
+# Request traces
+# -------------------
+class Trace:
+    """Spans, counters and a memory snapshot of one request."""
+
+    def __init__(self, name: str, **attrs):
+        self.name = name
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.attrs = attrs
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        self.duration = None
+        self.spans = []
+        self.counters = {}
+        self.memory = {}
+        self._lock = threading.Lock()
+
+    def add_span(self, name: str, start: float, duration: float, attrs: dict):
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "offset_ms": round((start - self.start) * 1000, 3),
+                "duration_ms": round(duration * 1000, 3),
+                **attrs,
+            })
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "trace_id": self.trace_id,
+                "started_at": self.started_at,
+                "duration_ms": round((self.duration or 0.0) * 1000, 3),
+                "attrs": dict(self.attrs),
+                "spans": sorted(self.spans, key=lambda s: s["offset_ms"]),
+                "counters": dict(self.counters),
+                "memory": dict(self.memory),
+            }
+
+
+_current_trace = contextvars.ContextVar("medbot_trace", default=None)
+_last_trace = None
+_log_lock = threading.Lock()
+
+
+def current_trace():
+    return _current_trace.get()
+
+
+def last_trace():
+    """The most recently finished trace in this process, as a dict."""
+    return _last_trace
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """Times a stage into the stage histogram and, if one is active, the current trace."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, start, time.perf_counter() - start, **attrs)
+
+
+def record_span(name: str, start: float, duration: float, **attrs):
+    registry.observe(name, duration)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_span(name, start, duration, attrs)
+
+
+def incr(name: str, value: float = 1, **labels):
+    registry.incr(name, value, **labels)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.incr(_series(name, tuple(sorted(labels.items()))), value)
+
+
+@contextmanager
+def start_trace(name: str, **attrs):
+    """
+    Collects every span and counter recorded in this context (including worker
+    threads started with a copied context) into one Trace. Finished traces are
+    kept as ``last_trace()`` and appended to MEDBOT_TRACE_LOG when it is set.
+    """
+    global _last_trace
+    trace = Trace(name, **attrs)
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    except BaseException as e:
+        trace.attrs["error"] = repr(e)
+        raise
+    finally:
+        _current_trace.reset(token)
+        trace.duration = time.perf_counter() - trace.start
+        trace.memory = memory_snapshot()
+        registry.observe(name, trace.duration)
+        _last_trace = trace.to_dict()
+        if TRACE_LOG_PATH:
+            with _log_lock, open(TRACE_LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(_last_trace) + "\n")